@@ -1,12 +1,156 @@
 """AI integration module for SAFECode-Web backend."""
 
 import time
+import re
+import json
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Optional
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import httpx
 import openai
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 from .config import get_config
-from .utils import as_utf8
+from .utils import as_utf8, confidence_score
+from .ai_cache import get_decision_cache
+
+
+# Functions whose findings the AI is never allowed to suppress
+_NEVER_SUPPRESS_RE = re.compile(r'\b(?:strcpy|strcat|gets|sprintf|vsprintf|system|popen)\b')
+
+# Prompt building blocks shared by single- and multi-task prompts
+_SYSTEM_ROLE = "You are a security code analysis expert. Provide accurate, conservative analysis of security findings."
+
+_INSTRUCTIONS = """Instructions:
+1. Review each finding and determine if it's a true positive or false positive
+2. For each finding, provide:
+   - "action": "suppress", "adjust_confidence", or "keep"
+   - "reason": Brief explanation
+   - "new_confidence": "low", "medium", or "high" (if adjusting)
+   - "finding_id": The finding number (1, 2, etc.)
+
+3. NEVER suppress findings involving these functions: strcpy, strcat, gets, sprintf, vsprintf, system, popen
+4. Be conservative - only suppress when you're very confident it's a false positive
+5. Consider context, bounds checking, and safe coding patterns"""
+
+_MULTI_PREFIX = f"""{_SYSTEM_ROLE}
+
+The next message contains several independent tasks, each starting with "### TASK <id>" and holding its own C code and security findings. Analyze each task separately to identify potential false positives and adjust confidence levels.
+
+{_INSTRUCTIONS}
+6. Finding numbers restart at 1 in every task; always report the task_id they belong to
+
+Respond in JSON format:
+{{
+  "tasks": [
+    {{
+      "task_id": 1,
+      "findings": [
+        {{
+          "finding_id": 1,
+          "action": "suppress",
+          "reason": "Safe printf with literal format string",
+          "new_confidence": null
+        }}
+      ]
+    }}
+  ]
+}}"""
+
+
+# Per-finding prompt entry; missing fields render as "Unknown"
+_FINDING_TEMPLATE = """
+Finding {number}:
+- CWE: {cwe_id}
+- Severity: {severity}
+- Line: {line}
+- Title: {title}
+- Snippet: {snippet}
+- Confidence: {confidence}
+"""
+
+
+@lru_cache(maxsize=128)
+def _stable_prefix(code: str) -> str:
+    """
+    Build the stable part of the suppression prompt: instructions, then code.
+    
+    Cached per source text so repeated scans of a file reuse the same string.
+    
+    Args:
+        code: Source code, already truncated to the prompt budget
+        
+    Returns:
+        str: Prompt prefix
+    """
+    return f"""{_SYSTEM_ROLE}
+
+Analyze the C code below together with the security findings in the next message to identify potential false positives and adjust confidence levels.
+
+{_INSTRUCTIONS}
+
+Respond in JSON format:
+{{
+  "findings": [
+    {{
+      "finding_id": 1,
+      "action": "suppress",
+      "reason": "Safe printf with literal format string",
+      "new_confidence": null
+    }}
+  ]
+}}
+
+Code:
+```c
+{code}
+```"""
+
+
+# Tokens held back from the prompt budget for the model's answer and framing
+_RESERVED_TOKENS = 1024
+
+
+def _estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of text (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+# Transient OpenAI failures worth retrying. The clients are built with
+# max_retries=0 so this is the only retry layer.
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def with_backoff(fn, attempts: int = 3, base: float = 1.0):
+    """
+    Call fn, retrying with linear backoff on transient OpenAI errors.
+    
+    Args:
+        fn: Zero-argument callable issuing the OpenAI request
+        attempts: Maximum number of attempts
+        base: Backoff unit in seconds; attempt i sleeps base * i
+        
+    Returns:
+        The return value of fn
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except RETRYABLE_ERRORS:
+            if attempt == attempts:
+                raise
+            time.sleep(base * attempt)
 
 
 class AISuppressionEngine:
@@ -16,12 +160,31 @@ class AISuppressionEngine:
         """Initialize AI suppression engine."""
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
+        self.decision_cache = get_decision_cache()
+        self.encoding = self._load_encoding()
+        
+        # Token budget for code + findings, and the share code may take
+        self.prompt_budget = (
+            self.config.openai_max_tokens_per_call
+            - self._count_tokens(_stable_prefix(""))
+            - _RESERVED_TOKENS
+        )
+        self.code_budget = self.prompt_budget // 2
         
         # Initialize OpenAI client if enabled
         if self.config.enable_gpt and self.config.openai_api_key:
             try:
                 openai.api_key = self.config.openai_api_key
-                self.client = openai.OpenAI(api_key=self.config.openai_api_key)
+                self.client = openai.OpenAI(
+                    api_key=self.config.openai_api_key,
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    max_retries=0
+                )
+                self.aclient = openai.AsyncOpenAI(
+                    api_key=self.config.openai_api_key,
+                    timeout=httpx.Timeout(120.0, connect=10.0),
+                    max_retries=0
+                )
                 self.available = True
                 self.logger.info("OpenAI client initialized successfully")
             except Exception as e:
@@ -47,51 +210,130 @@ class AISuppressionEngine:
             return findings
         
         try:
+            # Skip protected findings and reuse cached decisions
+            pending = self._findings_for_model(findings, code)
+            if not pending:
+                return findings
+            
             # Build prompt
-            prompt = self._build_prompt(findings, code)
+            prompt = self._build_prompt(pending, code)
             
             # Call OpenAI API
             response = self._call_openai(prompt)
             
             # Process response
-            processed_findings = self._process_ai_response(findings, response)
+            self._process_ai_response(pending, code, response)
             
-            return processed_findings
+            return findings
             
         except Exception as e:
             self.logger.error(f"Error in AI processing: {e}")
             return findings
     
-    def _build_prompt(self, findings: List[Dict], code: str) -> str:
+    def _build_prompt(self, findings: List[Dict], code: str) -> Tuple[str, str]:
         """
         Build prompt for OpenAI API.
         
+        The prompt is split into a stable prefix (instructions and code) and a
+        per-call suffix (findings) so repeated scans of the same file share a
+        byte-identical prefix and hit OpenAI's prompt cache.
+        
         Args:
             findings: List of findings
             code: Source code
             
         Returns:
-            str: Formatted prompt
+            Tuple[str, str]: (stable prefix, dynamic suffix)
         """
-        # Truncate code if too long
-        max_code_length = 8000  # Leave room for findings and instructions
-        if len(code) > max_code_length:
-            code = code[:max_code_length] + "\n... (truncated)"
+        code = self._truncate_to_tokens(code, self.code_budget)
+        findings_budget = self.prompt_budget - self._count_tokens(code)
+        return _stable_prefix(code), self._dynamic_suffix(findings, findings_budget)
+    
+    def _load_encoding(self):
+        """Load the tiktoken encoding for the configured model, if available."""
+        if tiktoken is None:
+            return None
+        
+        try:
+            try:
+                return tiktoken.encoding_for_model(self.config.openai_model)
+            except KeyError:
+                return tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            self.logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+            return None
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count prompt tokens, estimating when tiktoken is unavailable."""
+        if self.encoding is None:
+            return _estimate_tokens(text)
+        return len(self.encoding.encode(text))
+    
+    def _truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to at most max_tokens tokens.
         
-        # Build findings summary
-        findings_text = ""
+        Args:
+            text: Text to truncate
+            max_tokens: Token limit
+            
+        Returns:
+            str: Original or truncated text
+        """
+        if self.encoding is None:
+            max_chars = max_tokens * 4
+            if len(text) <= max_chars:
+                return text
+            return text[:max_chars] + "\n... (truncated)"
+        
+        tokens = self.encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens]) + "\n... (truncated)"
+    
+    def _dynamic_suffix(self, findings: List[Dict], max_tokens: Optional[int] = None) -> str:
+        """
+        Build the per-call part of the prompt listing the findings.
+        
+        Args:
+            findings: List of findings
+            max_tokens: Token budget for the findings; later findings are omitted
+            
+        Returns:
+            str: Findings section of the prompt
+        """
+        return f"""Security Findings:
+{self._findings_text(findings, max_tokens)}
+JSON Response:"""
+    
+    def _findings_text(self, findings: List[Dict], max_tokens: Optional[int] = None) -> str:
+        """Format findings as numbered prompt entries, stopping at max_tokens."""
+        parts = []
+        used = 0
         for i, finding in enumerate(findings):
-            findings_text += f"""
-Finding {i+1}:
-- CWE: {finding.get('cwe_id', 'Unknown')}
-- Severity: {finding.get('severity', 'Unknown')}
-- Line: {finding.get('line', 'Unknown')}
-- Title: {finding.get('title', 'Unknown')}
-- Snippet: {finding.get('snippet', 'Unknown')}
-- Confidence: {finding.get('confidence', 'Unknown')}
-"""
+            entry = _FINDING_TEMPLATE.format_map(defaultdict(lambda: 'Unknown', finding, number=i + 1))
+            if max_tokens is not None:
+                used += self._count_tokens(entry)
+                if used > max_tokens:
+                    break
+            parts.append(entry)
+        
+        omitted = len(findings) - len(parts)
+        if omitted:
+            parts.append(f"\n(+{omitted} findings omitted)\n")
+        
+        return "".join(parts)
+    
+    def _task_block(self, task_id: int, findings: List[Dict], code: str) -> str:
+        """
+        Format one (findings, code) pair as a task of a multi-task prompt.
         
-        prompt = f"""You are a security code analysis expert. Analyze the following C code and security findings to identify potential false positives and adjust confidence levels.
+        Code and findings share prompt_budget the same way as in
+        _build_prompt, so a single task never exceeds one call's budget.
+        """
+        code = self._truncate_to_tokens(code, self.code_budget)
+        findings_budget = self.prompt_budget - self._count_tokens(code)
+        return f"""### TASK {task_id}
 
 Code:
 ```c
@@ -99,37 +341,57 @@ Code:
 ```
 
 Security Findings:
-{findings_text}
-
-Instructions:
-1. Review each finding and determine if it's a true positive or false positive
-2. For each finding, provide:
-   - "action": "suppress", "adjust_confidence", or "keep"
-   - "reason": Brief explanation
-   - "new_confidence": "low", "medium", or "high" (if adjusting)
-   - "finding_id": The finding number (1, 2, etc.)
-
-3. NEVER suppress findings involving these functions: strcpy, strcat, gets, sprintf, vsprintf, system, popen
-4. Be conservative - only suppress when you're very confident it's a false positive
-5. Consider context, bounds checking, and safe coding patterns
-
-Respond in JSON format:
-{{
-  "findings": [
-    {{
-      "finding_id": 1,
-      "action": "suppress",
-      "reason": "Safe printf with literal format string",
-      "new_confidence": null
-    }}
-  ]
-}}
-
-JSON Response:"""
+{self._findings_text(findings, findings_budget)}
+"""
+    
+    def _build_multi_prompt(self, batches: List[Tuple[List[Dict], str]]) -> Tuple[str, str]:
+        """
+        Build a single prompt covering several (findings, code) pairs.
+        
+        Tasks are numbered from 1 in input order.
+        
+        Args:
+            batches: List of (findings, code) tuples
+            
+        Returns:
+            Tuple[str, str]: (stable prefix, task blocks)
+        """
+        tasks = "\n".join(
+            self._task_block(task_id, findings, code)
+            for task_id, (findings, code) in enumerate(batches, 1)
+        )
+        return _MULTI_PREFIX, f"{tasks}\nJSON Response:"
+    
+    def _completion_body(self, prompt: Tuple[str, str]) -> Dict:
+        """
+        Build chat completion request body shared by the sync and batch paths.
         
-        return prompt
+        Args:
+            prompt: (stable prefix, dynamic suffix) from _build_prompt
+            
+        Returns:
+            Dict: Request body for /v1/chat/completions
+        """
+        prefix, suffix = prompt
+        return {
+            "model": self.config.openai_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": prefix
+                },
+                {
+                    "role": "user",
+                    "content": suffix
+                }
+            ],
+            "temperature": 0.1,  # Low temperature for consistent results
+            "max_tokens": 2000,
+            # Route scans of the same file to the same prompt-cache shard
+            "user": hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+        }
     
-    def _call_openai(self, prompt: str) -> Optional[str]:
+    def _call_openai(self, prompt: Tuple[str, str]) -> Optional[str]:
         """
         Call OpenAI API.
         
@@ -140,21 +402,8 @@ JSON Response:"""
             Optional[str]: API response
         """
         try:
-            response = self.client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a security code analysis expert. Provide accurate, conservative analysis of security findings."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Low temperature for consistent results
-                max_tokens=2000,
-                timeout=30
+            response = with_backoff(
+                lambda: self.client.chat.completions.create(**self._completion_body(prompt))
             )
             
             return response.choices[0].message.content
@@ -163,12 +412,216 @@ JSON Response:"""
             self.logger.error(f"OpenAI API error: {e}")
             return None
     
-    def _process_ai_response(self, findings: List[Dict], response: Optional[str]) -> List[Dict]:
+    async def aprocess_findings(self, findings: List[Dict], code: str) -> List[Dict]:
+        """
+        Async variant of process_findings that does not block the event loop.
+        
+        Args:
+            findings: List of findings
+            code: Source code
+            
+        Returns:
+            List[Dict]: Processed findings
+        """
+        if not self.available or not findings:
+            return findings
+        
+        try:
+            pending = self._findings_for_model(findings, code)
+            if not pending:
+                return findings
+            
+            prompt = self._build_prompt(pending, code)
+            response = await self._acall_openai(prompt)
+            self._process_ai_response(pending, code, response)
+            return findings
+            
+        except Exception as e:
+            self.logger.error(f"Error in AI processing: {e}")
+            return findings
+    
+    async def process_findings_batch(self, items: List[Tuple[List[Dict], str]]) -> List[List[Dict]]:
+        """
+        Process several (findings, code) pairs concurrently.
+        
+        At most config.openai_concurrency requests are in flight at once.
+        
+        Args:
+            items: List of (findings, code) tuples
+            
+        Returns:
+            List[List[Dict]]: Processed findings, in input order
+        """
+        semaphore = asyncio.Semaphore(self.config.openai_concurrency)
+        
+        async def run(findings: List[Dict], code: str) -> List[Dict]:
+            async with semaphore:
+                return await self.aprocess_findings(findings, code)
+        
+        return list(await asyncio.gather(*[run(findings, code) for findings, code in items]))
+    
+    def process_findings_many(self, items: List[Tuple[List[Dict], str]]) -> List[List[Dict]]:
+        """
+        Process several (findings, code) pairs with as few completion calls as possible.
+        
+        Pairs are packed into multi-task prompts whose size stays within
+        config.openai_max_tokens_per_call.
+        
+        Args:
+            items: List of (findings, code) tuples
+            
+        Returns:
+            List[List[Dict]]: Processed findings, in input order
+        """
+        results = [findings for findings, _ in items]
+        if not self.available:
+            return results
+        
+        try:
+            # Pack pending pairs greedily into token-bounded chunks
+            chunks = []
+            chunk = []
+            chunk_tokens = self._count_tokens(_MULTI_PREFIX)
+            for findings, code in items:
+                pending = self._findings_for_model(findings, code)
+                if not pending:
+                    continue
+                
+                tokens = self._count_tokens(self._task_block(len(chunk) + 1, pending, code))
+                if chunk and chunk_tokens + tokens > self.config.openai_max_tokens_per_call:
+                    chunks.append(chunk)
+                    chunk = []
+                    chunk_tokens = self._count_tokens(_MULTI_PREFIX)
+                chunk.append((pending, code))
+                chunk_tokens += tokens
+            if chunk:
+                chunks.append(chunk)
+            
+            for chunk in chunks:
+                response = self._call_openai(self._build_multi_prompt(chunk))
+                self._process_multi_response(chunk, response)
+            
+        except Exception as e:
+            self.logger.error(f"Error in AI processing: {e}")
+        
+        return results
+    
+    def submit_batch(self, findings_groups: List[Tuple[str, List[Dict], str]]) -> Dict[str, List[Dict]]:
+        """
+        Process several scans through the OpenAI Batch API.
+        
+        Intended for non-interactive scans (CI, baselines) where latency does
+        not matter; the interactive path stays on process_findings.
+        
+        Args:
+            findings_groups: List of (scan_id, findings, code) tuples
+            
+        Returns:
+            Dict[str, List[Dict]]: Processed findings keyed by scan_id
+        """
+        results = {scan_id: findings for scan_id, findings, _ in findings_groups}
+        if not self.available:
+            return results
+        
+        # Only submit findings the model may still change
+        groups = []
+        for scan_id, findings, code in findings_groups:
+            pending = self._findings_for_model(findings, code)
+            if pending:
+                groups.append((scan_id, pending, code))
+        
+        if not groups:
+            return results
+        
+        try:
+            # Serialize one request per scan as JSONL
+            lines = []
+            for scan_id, findings, code in groups:
+                lines.append(json.dumps({
+                    "custom_id": scan_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_body(self._build_prompt(findings, code))
+                }))
+            payload = "\n".join(lines).encode("utf-8")
+            
+            # Upload input file and create batch
+            input_file = self.client.files.create(
+                file=("safecode_batch.jsonl", payload),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            self.logger.info(f"Submitted OpenAI batch {batch.id} with {len(groups)} scans")
+            
+            # Poll until the batch reaches a terminal state
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(self.config.openai_batch_poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                self.logger.error(f"OpenAI batch {batch.id} ended with status {batch.status}")
+                return results
+            
+            # Download output and dispatch responses by custom_id
+            output = self.client.files.content(batch.output_file_id).text
+            responses = {}
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                body = (item.get("response") or {}).get("body") or {}
+                choices = body.get("choices") or []
+                if choices:
+                    responses[item.get("custom_id")] = choices[0]["message"]["content"]
+            
+            for scan_id, pending, code in groups:
+                self._process_ai_response(pending, code, responses.get(scan_id))
+            
+        except Exception as e:
+            self.logger.error(f"Error in AI batch processing: {e}")
+        
+        return results
+    
+    async def _acall_openai(self, prompt: Tuple[str, str], attempts: int = 3) -> Optional[str]:
+        """
+        Call OpenAI API asynchronously, backing off linearly on rate limits.
+        
+        Args:
+            prompt: Prompt to send
+            attempts: Maximum number of attempts
+            
+        Returns:
+            Optional[str]: API response
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await self.aclient.chat.completions.create(
+                    **self._completion_body(prompt)
+                )
+                return response.choices[0].message.content
+                
+            except RETRYABLE_ERRORS as e:
+                if attempt == attempts:
+                    self.logger.error(f"OpenAI request failed after {attempts} attempts: {e}")
+                    return None
+                await asyncio.sleep(attempt)
+            except Exception as e:
+                self.logger.error(f"OpenAI API error: {e}")
+                return None
+        
+        return None
+    
+    def _process_ai_response(self, findings: List[Dict], code: str, response: Optional[str]) -> List[Dict]:
         """
         Process AI response and apply changes to findings.
         
         Args:
             findings: Original findings
+            code: Source code the findings were reported in
             response: AI response
             
         Returns:
@@ -178,31 +631,8 @@ JSON Response:"""
             return findings
         
         try:
-            import json
             ai_data = json.loads(response)
-            
-            # Process each AI recommendation
-            for ai_finding in ai_data.get('findings', []):
-                finding_id = ai_finding.get('finding_id')
-                action = ai_finding.get('action')
-                reason = ai_finding.get('reason', '')
-                new_confidence = ai_finding.get('new_confidence')
-                
-                # Find corresponding finding (1-based to 0-based)
-                if finding_id and 1 <= finding_id <= len(findings):
-                    finding = findings[finding_id - 1]
-                    
-                    # Check safety gates
-                    if self._should_never_suppress(finding):
-                        continue
-                    
-                    # Apply action
-                    if action == 'suppress':
-                        finding['status'] = 'SUPPRESSED'
-                        finding['suppression_reason'] = f"ai_suppression: {reason}"
-                    elif action == 'adjust_confidence' and new_confidence:
-                        finding['confidence'] = new_confidence
-                        finding['suppression_reason'] = f"ai_adjustment: {reason}"
+            self._apply_ai_findings(findings, code, ai_data.get('findings', []))
             
         except json.JSONDecodeError as e:
             self.logger.error(f"Error parsing AI response: {e}")
@@ -211,21 +641,112 @@ JSON Response:"""
         
         return findings
     
-    def _should_never_suppress(self, finding: Dict) -> bool:
-        """Check if finding should never be suppressed by AI."""
-        snippet = finding.get('snippet', '')
+    def _process_multi_response(self, batches: List[Tuple[List[Dict], str]], response: Optional[str]):
+        """
+        Process a multi-task AI response, dispatching each task by task_id.
+        
+        Args:
+            batches: (findings, code) tuples in task order (task_id 1 is first)
+            response: AI response
+        """
+        if not response:
+            return
+        
+        try:
+            ai_data = json.loads(response)
+            
+            for task in ai_data.get('tasks', []):
+                task_id = task.get('task_id')
+                if task_id and 1 <= task_id <= len(batches):
+                    findings, code = batches[task_id - 1]
+                    self._apply_ai_findings(findings, code, task.get('findings', []))
+            
+        except json.JSONDecodeError as e:
+            self.logger.error(f"Error parsing AI response: {e}")
+        except Exception as e:
+            self.logger.error(f"Error processing AI response: {e}")
+    
+    def _apply_ai_findings(self, findings: List[Dict], code: str, ai_findings: List[Dict]):
+        """
+        Apply and cache the per-finding AI recommendations for one task.
+        
+        Args:
+            findings: Findings the recommendations refer to
+            code: Source code the findings were reported in
+            ai_findings: Recommendations from the AI response
+        """
+        for ai_finding in ai_findings:
+            finding_id = ai_finding.get('finding_id')
+            action = ai_finding.get('action')
+            reason = ai_finding.get('reason', '')
+            new_confidence = ai_finding.get('new_confidence')
+            
+            # Find corresponding finding (1-based to 0-based)
+            if finding_id and 1 <= finding_id <= len(findings):
+                finding = findings[finding_id - 1]
+                self.decision_cache.put(finding, code, action, reason, new_confidence)
+                self._apply_decision(finding, action, reason, new_confidence)
+    
+    def _apply_decision(self, finding: Dict, action: Optional[str], reason: str, new_confidence: Optional[str]):
+        """
+        Apply a single AI decision to a finding, respecting safety gates.
         
-        # Check for never-suppress functions
-        never_suppress_funcs = [
-            "strcpy", "strcat", "gets", "sprintf", "vsprintf", 
-            "system", "popen"
-        ]
+        Args:
+            finding: Finding to update in place
+            action: AI action
+            reason: AI explanation
+            new_confidence: New confidence level if adjusting
+        """
+        # Check safety gates
+        if self._should_never_suppress(finding.get('snippet', '')):
+            return
         
-        for func in never_suppress_funcs:
-            if func in snippet:
-                return True
+        # Apply action
+        if action == 'suppress':
+            finding['status'] = 'SUPPRESSED'
+            finding['suppression_reason'] = f"ai_suppression: {reason}"
+        elif action == 'adjust_confidence' and new_confidence:
+            # Stored as a score so suppression thresholds can compare it
+            score = confidence_score(new_confidence)
+            if score is None:
+                self.logger.warning(f"Ignoring unknown AI confidence level: {new_confidence}")
+                return
+            finding['confidence'] = score
+            finding['suppression_reason'] = f"ai_adjustment: {reason}"
+    
+    def _findings_for_model(self, findings: List[Dict], code: str) -> List[Dict]:
+        """
+        Select the findings worth sending to the model.
         
-        return False
+        Findings gated by _should_never_suppress are skipped, since the model
+        cannot change them, and cached decisions are applied locally.
+        
+        Args:
+            findings: List of findings
+            code: Source code the findings were reported in
+            
+        Returns:
+            List[Dict]: Suppressible findings without a cached decision
+        """
+        pending = []
+        for finding in findings:
+            if self._should_never_suppress(finding.get('snippet', '')):
+                continue
+            
+            decision = self.decision_cache.get(finding, code)
+            if decision is None:
+                pending.append(finding)
+            else:
+                self._apply_decision(
+                    finding, decision['action'], decision['reason'], decision['new_confidence']
+                )
+        return pending
+    
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _should_never_suppress(snippet: str) -> bool:
+        """Check if a finding's snippet should never be suppressed by AI."""
+        return bool(_NEVER_SUPPRESS_RE.search(snippet))
 
 
 # Global AI engine instance
@@ -257,6 +778,49 @@ def process_findings_with_ai(findings: List[Dict], code: str) -> List[Dict]:
     return engine.process_findings(findings, code)
 
 
+async def aprocess_findings_with_ai(findings: List[Dict], code: str) -> List[Dict]:
+    """
+    Async variant of process_findings_with_ai for use from request handlers.
+    
+    Args:
+        findings: List of findings
+        code: Source code
+        
+    Returns:
+        List[Dict]: Processed findings
+    """
+    engine = get_ai_engine()
+    return await engine.aprocess_findings(findings, code)
+
+
+def process_findings_many_with_ai(items: List[Tuple[List[Dict], str]]) -> List[List[Dict]]:
+    """
+    Process several (findings, code) pairs, packing them into shared completion calls.
+    
+    Args:
+        items: List of (findings, code) tuples
+        
+    Returns:
+        List[List[Dict]]: Processed findings, in input order
+    """
+    engine = get_ai_engine()
+    return engine.process_findings_many(items)
+
+
+def submit_findings_batch(findings_groups: List[Tuple[str, List[Dict], str]]) -> Dict[str, List[Dict]]:
+    """
+    Process findings for several non-interactive scans via the OpenAI Batch API.
+    
+    Args:
+        findings_groups: List of (scan_id, findings, code) tuples
+        
+    Returns:
+        Dict[str, List[Dict]]: Processed findings keyed by scan_id
+    """
+    engine = get_ai_engine()
+    return engine.submit_batch(findings_groups)
+
+
 def is_ai_available() -> bool:
     """
     Check if AI processing is available.
@@ -0,0 +1,217 @@
+"""Local cache of AI suppression decisions for SAFECode-Web backend."""
+
+import hashlib
+import re
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional
+
+from .config import get_config
+
+
+# Snippet line prefix added by the runners, e.g. ">>>  12: " or "     11: "
+_LINE_MARKER_RE = re.compile(r'^(?:>>> |    )\s*\d+: ', re.MULTILINE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Lines either side of the finding hashed when no enclosing function is found
+_CONTEXT_WINDOW = 5
+
+
+def _enclosing_context(lines: List[str], line: int) -> List[str]:
+    """
+    Get the C function enclosing a line, or the lines around it.
+
+    The function header is the nearest line above that starts in column 0
+    and contains "("; its body is found by matching braces.
+
+    Args:
+        lines: Source code lines
+        line: 1-based line number of the finding
+
+    Returns:
+        List[str]: Context lines
+    """
+    index = min(max(line, 1), len(lines)) - 1
+
+    for start in range(index, -1, -1):
+        text = lines[start]
+        if text.startswith('}'):
+            break
+        if not text or text[0].isspace() or text.startswith('#') or '(' not in text:
+            continue
+
+        depth = 0
+        opened = False
+        for end in range(start, len(lines)):
+            depth += lines[end].count('{') - lines[end].count('}')
+            opened = opened or '{' in lines[end]
+            if opened and depth <= 0:
+                if end >= index:
+                    return lines[start:end + 1]
+                break
+        break
+
+    return lines[max(0, index - _CONTEXT_WINDOW):index + _CONTEXT_WINDOW + 1]
+
+
+def make_cache_key(finding: Dict, code: str = "") -> str:
+    """
+    Build a cache key from a finding's CWE, normalized snippet and context.
+
+    Line-number markers and whitespace are stripped so the same code reported
+    at a different line, or reformatted, maps to the same entry. The enclosing
+    function is hashed in so an identical line in a different function (where
+    the AI may have judged it differently) gets its own entry.
+
+    Args:
+        finding: Finding dictionary
+        code: Source code the finding was reported in
+
+    Returns:
+        str: Cache key
+    """
+    snippet = _LINE_MARKER_RE.sub('', finding.get('snippet', '') or '')
+    snippet = _WHITESPACE_RE.sub(' ', snippet).strip()
+
+    context = ''
+    if code:
+        context = '\n'.join(_enclosing_context(code.split('\n'), finding.get('line') or 1))
+        context = _WHITESPACE_RE.sub(' ', context).strip()
+    context_hash = hashlib.sha256(context.encode('utf-8')).hexdigest()[:16]
+
+    return f"{finding.get('cwe_id', 'Unknown')}|{snippet}|{context_hash}"
+
+
+class SuppressionDecisionCache:
+    """Bounded LFU cache of AI decisions, evicting least recently used on ties."""
+
+    def __init__(self, capacity: int = 50000, ttl_seconds: int = 604800):
+        """
+        Initialize decision cache.
+
+        Args:
+            capacity: Maximum number of cached decisions
+            ttl_seconds: Age after which a decision is discarded (0 disables)
+        """
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Dict] = {}
+        self.freq: Dict[str, int] = {}
+        self.buckets: Dict[int, OrderedDict] = defaultdict(OrderedDict)
+        self.min_freq = 0
+        self.lock = threading.Lock()
+
+    def get(self, finding: Dict, code: str = "") -> Optional[Dict]:
+        """
+        Get the cached decision for a finding.
+
+        Args:
+            finding: Finding dictionary
+            code: Source code the finding was reported in
+
+        Returns:
+            Optional[Dict]: Cached decision or None if missing or expired
+        """
+        key = make_cache_key(finding, code)
+
+        with self.lock:
+            if key not in self.entries:
+                return None
+            if self.ttl_seconds > 0 and time.time() - self.entries[key]['created_at'] > self.ttl_seconds:
+                self._remove(key)
+                return None
+            self._touch(key)
+            return self.entries[key]
+
+    def put(self, finding: Dict, code: str, action: str, reason: str, new_confidence: Optional[str]):
+        """
+        Cache the AI decision for a finding.
+
+        Args:
+            finding: Finding dictionary
+            code: Source code the finding was reported in
+            action: AI action ("suppress", "adjust_confidence" or "keep")
+            reason: AI explanation
+            new_confidence: New confidence level if adjusting
+        """
+        if self.capacity <= 0:
+            return
+
+        key = make_cache_key(finding, code)
+        decision = {
+            'action': action,
+            'reason': reason,
+            'new_confidence': new_confidence,
+            'created_at': time.time()
+        }
+
+        with self.lock:
+            if key in self.entries:
+                self.entries[key] = decision
+                self._touch(key)
+                return
+
+            if len(self.entries) >= self.capacity:
+                evicted, _ = self.buckets[self.min_freq].popitem(last=False)
+                if not self.buckets[self.min_freq]:
+                    del self.buckets[self.min_freq]
+                del self.entries[evicted]
+                del self.freq[evicted]
+
+            self.entries[key] = decision
+            self.freq[key] = 1
+            self.buckets[1][key] = None
+            self.min_freq = 1
+
+    def _touch(self, key: str):
+        """Move key to the next frequency bucket (caller holds the lock)."""
+        count = self.freq[key]
+        del self.buckets[count][key]
+        if not self.buckets[count]:
+            del self.buckets[count]
+            if self.min_freq == count:
+                self.min_freq = count + 1
+
+        self.freq[key] = count + 1
+        self.buckets[count + 1][key] = None
+
+    def _remove(self, key: str):
+        """Drop key from the cache (caller holds the lock)."""
+        count = self.freq.pop(key)
+        del self.entries[key]
+        del self.buckets[count][key]
+        if not self.buckets[count]:
+            del self.buckets[count]
+            if self.min_freq == count:
+                self.min_freq = min(self.buckets, default=0)
+
+    def clear(self):
+        """Clear all cached decisions."""
+        with self.lock:
+            self.entries.clear()
+            self.freq.clear()
+            self.buckets.clear()
+            self.min_freq = 0
+
+    def size(self) -> int:
+        """Get number of cached decisions."""
+        return len(self.entries)
+
+
+# Global decision cache instance
+_decision_cache = None
+
+
+def get_decision_cache() -> SuppressionDecisionCache:
+    """Get the global AI decision cache instance."""
+    global _decision_cache
+
+    if _decision_cache is None:
+        config = get_config()
+        _decision_cache = SuppressionDecisionCache(
+            capacity=config.ai_cache_capacity,
+            ttl_seconds=config.ai_cache_ttl_seconds
+        )
+
+    return _decision_cache
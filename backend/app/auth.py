@@ -2,6 +2,7 @@
 
 import hmac
 import hashlib
+from functools import lru_cache
 from typing import Optional
 from fastapi import HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -13,6 +14,20 @@ from .utils import as_utf8
 security = HTTPBearer(auto_error=False)
 
 
+@lru_cache(maxsize=1)
+def _expected_token_bytes() -> Optional[bytes]:
+    """
+    Get the configured API token as UTF-8 bytes, computed once.
+    
+    Call _expected_token_bytes.cache_clear() after reloading configuration.
+    
+    Returns:
+        Optional[bytes]: Encoded token, or None if authentication is disabled
+    """
+    token = get_config().api_token
+    return token.encode('utf-8') if token else None
+
+
 def require_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> str:
     """
     Require valid Bearer token authentication.
@@ -26,9 +41,9 @@ def require_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(s
     Raises:
         HTTPException: If authentication fails
     """
-    config = get_config()
+    expected = _expected_token_bytes()
     
-    if not config.api_token:
+    if expected is None:
         # If no token is configured, allow all requests
         return "no-auth-required"
     
@@ -41,7 +56,7 @@ def require_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(s
     
     token = as_utf8(credentials.credentials)
     
-    if not verify_token(token, config.api_token):
+    if not verify_token(token, expected):
         raise HTTPException(
             status_code=401,
             detail="Invalid authentication token",
@@ -51,25 +66,22 @@ def require_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(s
     return token
 
 
-def verify_token(provided_token: str, expected_token: str) -> bool:
+def verify_token(provided_token: str, expected_bytes: bytes) -> bool:
     """
     Verify token using constant-time comparison.
     
     Args:
         provided_token: Token provided by client
-        expected_token: Expected token from configuration
+        expected_bytes: Expected token from configuration, UTF-8 encoded
         
     Returns:
         bool: True if tokens match, False otherwise
     """
-    if not provided_token or not expected_token:
+    if not provided_token or not expected_bytes:
         return False
     
     # Use constant-time comparison to prevent timing attacks
-    return hmac.compare_digest(
-        provided_token.encode('utf-8'),
-        expected_token.encode('utf-8')
-    )
+    return hmac.compare_digest(provided_token.encode('utf-8'), expected_bytes)
 
 
 def optional_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[str]:
@@ -82,9 +94,9 @@ def optional_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(
     Returns:
         Optional[str]: The authenticated token or None
     """
-    config = get_config()
+    expected = _expected_token_bytes()
     
-    if not config.api_token:
+    if expected is None:
         return "no-auth-required"
     
     if not credentials:
@@ -92,7 +104,7 @@ def optional_auth(credentials: Optional[HTTPAuthorizationCredentials] = Depends(
     
     token = as_utf8(credentials.credentials)
     
-    if verify_token(token, config.api_token):
+    if verify_token(token, expected):
         return token
     
     return None
@@ -108,9 +120,9 @@ def get_auth_status(request: Request) -> dict:
     Returns:
         dict: Authentication status information
     """
-    config = get_config()
+    expected = _expected_token_bytes()
     
-    if not config.api_token:
+    if expected is None:
         return {
             "authenticated": True,
             "method": "none",
@@ -135,7 +147,7 @@ def get_auth_status(request: Request) -> dict:
     
     token = auth_header[7:]  # Remove "Bearer " prefix
     
-    if verify_token(token, config.api_token):
+    if verify_token(token, expected):
         return {
             "authenticated": True,
             "method": "bearer",
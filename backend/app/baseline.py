@@ -1,14 +1,51 @@
 """Baseline management module for SAFECode-Web backend."""
 
+import re
+import copy
 import json
 import os
+import asyncio
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .models import BaselineReport
 from .utils import as_utf8, create_summary_stats
 
+# Characters not allowed in baseline file and directory names
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9._-]')
+
+# Per-repository subdirectory holding the metadata sidecars; sanitized branch
+# names only ever name <branch>.json files, so they cannot collide with it
+_META_DIR = '.meta'
+
+
+def _dump_json(data: Any, pretty: bool = False) -> bytes:
+    """Serialize baseline data to UTF-8 JSON bytes, indented if pretty."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if pretty else None, ensure_ascii=False).encode('utf-8')
+
+
+def _load_json(raw: bytes) -> Any:
+    """Parse baseline JSON from bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 class BaselineManager:
     """Manager for baseline scan results."""
@@ -23,14 +60,20 @@ class BaselineManager:
         self.baseline_dir = Path(baseline_dir)
         self.baseline_dir.mkdir(exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        
+        # Recently loaded baselines: path -> (mtime_ns, data), in LRU order
+        self.loaded: OrderedDict = OrderedDict()
+        self.loaded_max = 128
+        self.lock = threading.Lock()
     
-    def get_baseline_path(self, repo: str, branch: str) -> Path:
+    def get_baseline_path(self, repo: str, branch: str, create: bool = True) -> Path:
         """
         Get path for baseline file.
         
         Args:
             repo: Repository name
             branch: Branch name
+            create: Create the repository directory if missing
             
         Returns:
             Path: Path to baseline file
@@ -40,17 +83,29 @@ class BaselineManager:
         safe_branch = self._sanitize_name(branch)
         
         repo_dir = self.baseline_dir / safe_repo
-        repo_dir.mkdir(exist_ok=True)
+        if create:
+            repo_dir.mkdir(exist_ok=True)
         
         return repo_dir / f"{safe_branch}.json"
     
-    def _sanitize_name(self, name: str) -> str:
+    def get_meta_path(self, baseline_path: Path) -> Path:
+        """
+        Get path for the metadata sidecar of a baseline file.
+        
+        Args:
+            baseline_path: Path to baseline file
+            
+        Returns:
+            Path: Path to metadata file (.meta/<branch>.json)
+        """
+        return baseline_path.parent / _META_DIR / baseline_path.name
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sanitize_name(name: str) -> str:
         """Sanitize name for filesystem use."""
-        import re
-        # Replace unsafe characters with underscores
-        sanitized = re.sub(r'[^a-zA-Z0-9._-]', '_', name)
-        # Limit length
-        return sanitized[:50]
+        # Replace unsafe characters with underscores and limit length
+        return _SANITIZE_RE.sub('_', name)[:50]
     
     def save_baseline(self, repo: str, branch: str, findings: List[Dict]) -> bool:
         """
@@ -81,8 +136,14 @@ class BaselineManager:
             }
             
             # Write to file
-            with open(baseline_path, 'w', encoding='utf-8') as f:
-                json.dump(baseline_data, f, indent=2, ensure_ascii=False)
+            self._write_atomic(baseline_path, baseline_data)
+            self._forget_loaded(baseline_path)
+            
+            # Write metadata sidecar so listings don't parse the findings
+            metadata = {key: value for key, value in baseline_data.items() if key != 'findings'}
+            meta_path = self.get_meta_path(baseline_path)
+            meta_path.parent.mkdir(exist_ok=True)
+            self._write_atomic(meta_path, metadata)
             
             self.logger.info(f"Baseline saved: {baseline_path}")
             return True
@@ -91,10 +152,54 @@ class BaselineManager:
             self.logger.error(f"Error saving baseline: {e}")
             return False
     
+    def _forget_loaded(self, baseline_path: Path):
+        """Drop a baseline from the in-memory cache after it changes on disk."""
+        with self.lock:
+            self.loaded.pop(baseline_path, None)
+    
+    def _write_atomic(self, path: Path, data: Any):
+        """
+        Write JSON data so readers only ever see a complete file.
+        
+        Data goes to a temporary file in the same directory, which then
+        replaces the target. Output is indented only when debug logging is on.
+        
+        Args:
+            path: Destination path
+            data: JSON-serializable data
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_dump_json(data, pretty=self.logger.isEnabledFor(logging.DEBUG)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
     def load_baseline(self, repo: str, branch: str) -> Optional[Dict]:
         """
         Load baseline scan results.
         
+        Args:
+            repo: Repository name
+            branch: Branch name
+            
+        Returns:
+            Optional[Dict]: Baseline data (the caller's own copy) or None
+        """
+        baseline_data = self._load_shared(repo, branch)
+        if baseline_data is None:
+            return None
+        return copy.deepcopy(baseline_data)
+    
+    def _load_shared(self, repo: str, branch: str) -> Optional[Dict]:
+        """
+        Load baseline scan results through the parsed-baseline cache.
+        
+        The returned dict is shared with the cache and must be treated as
+        read-only; load_baseline hands out copies.
+        
         Args:
             repo: Repository name
             branch: Branch name
@@ -103,13 +208,28 @@ class BaselineManager:
             Optional[Dict]: Baseline data or None
         """
         try:
-            baseline_path = self.get_baseline_path(repo, branch)
+            # Lookups must not leave a directory behind for every scanned name
+            baseline_path = self.get_baseline_path(repo, branch, create=False)
             
             if not baseline_path.exists():
                 return None
             
-            with open(baseline_path, 'r', encoding='utf-8') as f:
-                baseline_data = json.load(f)
+            # Reuse the parsed baseline while the file is unchanged
+            mtime = baseline_path.stat().st_mtime_ns
+            with self.lock:
+                cached = self.loaded.get(baseline_path)
+                if cached is not None and cached[0] == mtime:
+                    self.loaded.move_to_end(baseline_path)
+                    return cached[1]
+            
+            with open(baseline_path, 'rb') as f:
+                baseline_data = _load_json(f.read())
+            
+            with self.lock:
+                self.loaded[baseline_path] = (mtime, baseline_data)
+                self.loaded.move_to_end(baseline_path)
+                if len(self.loaded) > self.loaded_max:
+                    self.loaded.popitem(last=False)
             
             self.logger.info(f"Baseline loaded: {baseline_path}")
             return baseline_data
@@ -130,7 +250,7 @@ class BaselineManager:
         Returns:
             Optional[BaselineReport]: Comparison report or None
         """
-        baseline_data = self.load_baseline(repo, branch)
+        baseline_data = self._load_shared(repo, branch)
         if not baseline_data:
             return None
         
@@ -146,25 +266,20 @@ class BaselineManager:
             current_suppression_rate = current_summary.get('suppression_rate', 0.0)
             drift = abs(current_suppression_rate - baseline_suppression_rate)
             
-            # Count findings by severity and status
-            active_by_severity = {}
-            suppressed_by_severity = {}
+            # Count findings by severity and status in a single pass
+            active_by_severity = Counter()
+            suppressed_by_severity = Counter()
             
             for finding in current_findings:
-                severity = finding.get('severity', 'MEDIUM')
-                status = finding.get('status', 'ACTIVE')
-                
-                if status == 'ACTIVE':
-                    active_by_severity[severity] = active_by_severity.get(severity, 0) + 1
-                else:
-                    suppressed_by_severity[severity] = suppressed_by_severity.get(severity, 0) + 1
+                bucket = active_by_severity if finding.get('status', 'ACTIVE') == 'ACTIVE' else suppressed_by_severity
+                bucket[finding.get('severity', 'MEDIUM')] += 1
             
             # Calculate severity changes
             severity_changes = {}
             baseline_by_severity = baseline_summary.get('totals_by_severity', {})
             
-            for severity in set(list(active_by_severity.keys()) + list(baseline_by_severity.keys())):
-                current_count = active_by_severity.get(severity, 0)
+            for severity in active_by_severity.keys() | baseline_by_severity.keys():
+                current_count = active_by_severity[severity]
                 baseline_count = baseline_by_severity.get(severity, 0)
                 
                 if baseline_count > 0:
@@ -177,8 +292,8 @@ class BaselineManager:
                     }
             
             return BaselineReport(
-                active=active_by_severity,
-                suppressed=suppressed_by_severity,
+                active=dict(active_by_severity),
+                suppressed=dict(suppressed_by_severity),
                 drift=drift if drift > 0.01 else None,  # Only show if significant
                 severity_changes=severity_changes if severity_changes else None
             )
@@ -203,8 +318,16 @@ class BaselineManager:
                     
                     for baseline_file in repo_dir.glob("*.json"):
                         try:
-                            with open(baseline_file, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
+                            # Prefer the small metadata sidecar; older baselines lack one
+                            meta_file = self.get_meta_path(baseline_file)
+                            source = meta_file if meta_file.exists() else baseline_file
+                            with open(source, 'rb') as f:
+                                data = _load_json(f.read())
+                            
+                            # Sidecars used to sit next to the baselines as
+                            # <branch>.meta.json; unlike baselines they have no findings
+                            if source is baseline_file and 'findings' not in data:
+                                continue
                             
                             baselines.append({
                                 'repo': data.get('repo', repo_name),
@@ -220,6 +343,20 @@ class BaselineManager:
         
         return baselines
     
+    async def acompare_with_baseline(self, repo: str, branch: str, current_findings: List[Dict]) -> Optional[BaselineReport]:
+        """
+        Compare current findings with baseline without blocking the event loop.
+        
+        Args:
+            repo: Repository name
+            branch: Branch name
+            current_findings: Current scan findings
+            
+        Returns:
+            Optional[BaselineReport]: Comparison report or None
+        """
+        return await asyncio.to_thread(self.compare_with_baseline, repo, branch, current_findings)
+    
     def delete_baseline(self, repo: str, branch: str) -> bool:
         """
         Delete a baseline.
@@ -236,6 +373,11 @@ class BaselineManager:
             
             if baseline_path.exists():
                 baseline_path.unlink()
+                self._forget_loaded(baseline_path)
+                
+                meta_path = self.get_meta_path(baseline_path)
+                if meta_path.exists():
+                    meta_path.unlink()
                 self.logger.info(f"Baseline deleted: {baseline_path}")
                 return True
             else:
@@ -248,8 +390,7 @@ class BaselineManager:
     
     def _get_current_timestamp(self) -> str:
         """Get current timestamp string."""
-        import datetime
-        return datetime.datetime.now().isoformat()
+        return datetime.now().isoformat()
     
     def get_baseline_stats(self, repo: str, branch: str) -> Optional[Dict]:
         """
@@ -262,7 +403,7 @@ class BaselineManager:
         Returns:
             Optional[Dict]: Baseline statistics
         """
-        baseline_data = self.load_baseline(repo, branch)
+        baseline_data = self._load_shared(repo, branch)
         if not baseline_data:
             return None
         
@@ -271,7 +412,7 @@ class BaselineManager:
             'branch': baseline_data.get('branch'),
             'timestamp': baseline_data.get('timestamp'),
             'findings_count': baseline_data.get('findings_count', 0),
-            'summary': baseline_data.get('summary', {})
+            'summary': copy.deepcopy(baseline_data.get('summary', {}))
         }
 
 
@@ -1,25 +1,62 @@
 """Code Fixer using GPT to automatically fix C code vulnerabilities."""
 
+import asyncio
 import logging
 import json
+from types import MappingProxyType
 from typing import List, Dict, Optional, Tuple
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from .config import get_config
+from .ai import RETRYABLE_ERRORS, with_backoff
 
 logger = logging.getLogger(__name__)
 
+# Fix type applied for each CWE, with a fallback by Flawfinder category
+_FIX_TYPES_BY_CWE = MappingProxyType({
+    'CWE-120': 'buffer_overflow_protection',
+    'CWE-134': 'format_string_protection',
+    'CWE-78': 'command_injection_protection',
+    'CWE-190': 'integer_overflow_protection',
+    'CWE-367': 'race_condition_protection'
+})
+
+_FIX_TYPES_BY_CATEGORY = MappingProxyType({
+    'buffer': 'buffer_overflow_protection',
+    'format': 'format_string_protection',
+    'shell': 'command_injection_protection',
+    'tob': 'integer_overflow_protection',
+    'race': 'race_condition_protection'
+})
+
 
 class CodeFixer:
     """Code fixer using GPT to fix C code vulnerabilities."""
 
+    __slots__ = ('config', 'client', 'aclient')
+
     def __init__(self):
         """Initialize code fixer."""
         self.config = get_config()
         self.client = None
+        self.aclient = None
         
         if self.config.enable_gpt and self.config.openai_api_key:
             try:
-                self.client = OpenAI(api_key=self.config.openai_api_key)
+                # Keep-alive pools are reused across requests by the singleton
+                limits = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+                self.client = OpenAI(
+                    api_key=self.config.openai_api_key,
+                    timeout=httpx.Timeout(60.0, connect=5.0),
+                    max_retries=0,
+                    http_client=httpx.Client(limits=limits)
+                )
+                self.aclient = AsyncOpenAI(
+                    api_key=self.config.openai_api_key,
+                    timeout=httpx.Timeout(120.0, connect=10.0),
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(limits=limits)
+                )
                 logger.info("OpenAI client initialized for code fixing")
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
@@ -45,20 +82,8 @@ class CodeFixer:
             prompt = self._build_fix_prompt(original_code, vulnerabilities)
             
             # Call GPT
-            response = self.client.chat.completions.create(
-                model=self.config.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a C security expert. Fix security vulnerabilities in C code. Return only the fixed code, no explanations."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,
-                max_tokens=4000
+            response = with_backoff(
+                lambda: self.client.chat.completions.create(**self._completion_body(prompt))
             )
 
             fixed_code = response.choices[0].message.content.strip()
@@ -72,9 +97,79 @@ class CodeFixer:
             logger.error(f"Error fixing code with GPT: {e}")
             return original_code, []
 
+    async def afix_code(self, original_code: str, vulnerabilities: List[Dict], attempts: int = 3) -> Tuple[str, List[Dict]]:
+        """
+        Async variant of fix_code, backing off linearly on rate limits.
+        
+        Args:
+            original_code: Original C code
+            vulnerabilities: List of vulnerabilities found
+            attempts: Maximum number of attempts
+            
+        Returns:
+            Tuple of (fixed_code, fix_details)
+        """
+        if not self.aclient or not vulnerabilities:
+            return original_code, []
+
+        prompt = self._build_fix_prompt(original_code, vulnerabilities)
+
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await self.aclient.chat.completions.create(**self._completion_body(prompt))
+                fixed_code = response.choices[0].message.content.strip()
+                return fixed_code, self._extract_fix_details(original_code, fixed_code, vulnerabilities)
+
+            except RETRYABLE_ERRORS as e:
+                if attempt == attempts:
+                    logger.error(f"OpenAI request failed after {attempts} attempts while fixing code: {e}")
+                    break
+                await asyncio.sleep(attempt)
+            except Exception as e:
+                logger.error(f"Error fixing code with GPT: {e}")
+                break
+
+        return original_code, []
+
+    async def afix_many(self, items: List[Tuple[str, List[Dict]]]) -> List[Tuple[str, List[Dict]]]:
+        """
+        Fix several files concurrently, bounded by config.openai_concurrency.
+        
+        Args:
+            items: List of (original_code, vulnerabilities) tuples
+            
+        Returns:
+            List of (fixed_code, fix_details) tuples, in input order
+        """
+        semaphore = asyncio.Semaphore(self.config.openai_concurrency)
+
+        async def run(code: str, vulnerabilities: List[Dict]) -> Tuple[str, List[Dict]]:
+            async with semaphore:
+                return await self.afix_code(code, vulnerabilities)
+
+        return list(await asyncio.gather(*[run(code, vulns) for code, vulns in items]))
+
+    def _completion_body(self, prompt: str) -> Dict:
+        """Build chat completion request body for a fix prompt."""
+        return {
+            "model": self.config.openai_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a C security expert. Fix security vulnerabilities in C code. Return only the fixed code, no explanations."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.1,
+            "max_tokens": 4000
+        }
+
     def _build_fix_prompt(self, code: str, vulnerabilities: List[Dict]) -> str:
         """Build prompt for GPT to fix vulnerabilities."""
-        prompt = f"""Fix the following C code vulnerabilities:
+        parts = [f"""Fix the following C code vulnerabilities:
 
 Original Code:
 ```c
@@ -82,19 +177,20 @@ Original Code:
 ```
 
 Vulnerabilities found:
-"""
+"""]
         
         for i, vuln in enumerate(vulnerabilities, 1):
-            prompt += f"""
+            context = vuln.get('context', {})
+            parts.append(f"""
 {i}. {vuln['title']} (Line {vuln['line']})
    - CWE: {vuln['cwe_id']}
    - Severity: {vuln['severity']}
-   - Description: {vuln.get('context', {}).get('description', 'N/A')}
-   - Suggestion: {vuln.get('context', {}).get('suggestion', 'N/A')}
+   - Description: {context.get('description', 'N/A')}
+   - Suggestion: {context.get('suggestion', 'N/A')}
    - Code: {vuln['snippet']}
-"""
+""")
 
-        prompt += """
+        parts.append("""
 
 Instructions:
 1. Fix all security vulnerabilities
@@ -107,19 +203,14 @@ Instructions:
 
 Fixed Code:
 ```c
-"""
+""")
         
-        return prompt
+        return "".join(parts)
 
     def _extract_fix_details(self, original_code: str, fixed_code: str, vulnerabilities: List[Dict]) -> List[Dict]:
         """Extract details about what was fixed."""
-        fix_details = []
-        
-        original_lines = original_code.split('\n')
-        fixed_lines = fixed_code.split('\n')
-        
-        for vuln in vulnerabilities:
-            fix_detail = {
+        return [
+            {
                 "vulnerability_id": vuln['id'],
                 "cwe_id": vuln['cwe_id'],
                 "original_line": vuln['line'],
@@ -128,42 +219,38 @@ Fixed Code:
                 "fix_applied": True,
                 "fix_type": self._determine_fix_type(vuln)
             }
-            fix_details.append(fix_detail)
-        
-        return fix_details
+            for vuln in vulnerabilities
+        ]
 
     def _determine_fix_type(self, vulnerability: Dict) -> str:
         """Determine the type of fix applied."""
-        cwe = vulnerability['cwe_id']
-        category = vulnerability.get('context', {}).get('category', '').lower()
-        
-        fix_types = {
-            'CWE-120': 'buffer_overflow_protection',
-            'CWE-134': 'format_string_protection', 
-            'CWE-78': 'command_injection_protection',
-            'CWE-190': 'integer_overflow_protection',
-            'CWE-367': 'race_condition_protection'
-        }
-        
-        if cwe in fix_types:
-            return fix_types[cwe]
+        fix_type = _FIX_TYPES_BY_CWE.get(vulnerability['cwe_id'])
+        if fix_type:
+            return fix_type
         
         # Map by category
-        category_fixes = {
-            'buffer': 'buffer_overflow_protection',
-            'format': 'format_string_protection',
-            'shell': 'command_injection_protection',
-            'tob': 'integer_overflow_protection',
-            'race': 'race_condition_protection'
-        }
-        
-        return category_fixes.get(category, 'general_security_fix')
+        category = vulnerability.get('context', {}).get('category', '').lower()
+        return _FIX_TYPES_BY_CATEGORY.get(category, 'general_security_fix')
 
     def is_available(self) -> bool:
         """Check if code fixing is available."""
         return self.client is not None
 
 
+# Global code fixer instance
+_code_fixer = None
+
+
+def get_code_fixer() -> CodeFixer:
+    """Get the global code fixer instance."""
+    global _code_fixer
+    
+    if _code_fixer is None:
+        _code_fixer = CodeFixer()
+    
+    return _code_fixer
+
+
 def fix_code_with_gpt(original_code: str, vulnerabilities: List[Dict]) -> Tuple[str, List[Dict]]:
     """
     Fix C code vulnerabilities using GPT.
@@ -175,5 +262,20 @@ def fix_code_with_gpt(original_code: str, vulnerabilities: List[Dict]) -> Tuple[
     Returns:
         Tuple of (fixed_code, fix_details)
     """
-    fixer = CodeFixer()
+    fixer = get_code_fixer()
     return fixer.fix_code(original_code, vulnerabilities)
+
+
+async def afix_code_with_gpt(original_code: str, vulnerabilities: List[Dict]) -> Tuple[str, List[Dict]]:
+    """
+    Async variant of fix_code_with_gpt for use from request handlers.
+    
+    Args:
+        original_code: Original C code
+        vulnerabilities: List of vulnerabilities found
+        
+    Returns:
+        Tuple of (fixed_code, fix_details)
+    """
+    fixer = get_code_fixer()
+    return await fixer.afix_code(original_code, vulnerabilities)
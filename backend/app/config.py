@@ -1,32 +1,37 @@
 """Configuration management for SAFECode-Web backend."""
 import os
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
     # API Configuration
     api_token: str
     host: str = "0.0.0.0"
     port: int = 8001
+    workers: int = 1
     
     # Analyzer Configuration
     analyzer: str = "flawfinder"  # choices: "flawfinder", "semgrep"
     flawfinder_path: str = "flawfinder"
     flawfinder_max_findings: int = 1000
     flawfinder_timeout: int = 60
+    analyzer_jobs: int = 4
     
     # Semgrep Configuration (legacy)
     semgrep_timeout: int = 60
     semgrep_jobs: int = 4
     semgrep_max_findings: int = 250
     semgrep_max_target_bytes: int = 2000000
+    semgrep_cache_dir: str = ""
     
     # Response Limits
     safe_max_findings_response: int = 200
     safe_max_inline_code_chars: int = 20000
     safe_max_snippet_chars: int = 600
+    safe_max_request_bytes: int = 131072
     
     # Rate Limiting
     rate_limit_requests: int = 100
@@ -36,59 +41,74 @@ class Config:
     enable_gpt: bool = False
     openai_api_key: str = ""
     openai_model: str = "gpt-4o-mini"
+    openai_batch_poll_interval: int = 30
+    openai_concurrency: int = 4
+    openai_max_tokens_per_call: int = 12000
+    ai_cache_capacity: int = 50000
+    ai_cache_ttl_seconds: int = 604800
     
     # Caching
     cache_ttl_seconds: int = 120
+    cache_max_entries: int = 1024
+    scan_cache_capacity: int = 1024
+    telemetry_refresh_seconds: float = 1.0
+    health_refresh_seconds: float = 30.0
+    
+    # Compression
+    gzip_min_size: int = 1024
+    gzip_compress_level: int = 1
     
     # Logging
     log_level: str = "info"
     
     # Safety Gates
-    never_suppress_funcs: List[str] = None
-    safe_strict_min_thresholds: Dict[str, float] = None
-    
-    def __post_init__(self):
-        """Initialize default values for complex fields."""
-        if self.never_suppress_funcs is None:
-            self.never_suppress_funcs = [
-                "strcpy", "strcat", "gets", "sprintf", "vsprintf", 
-                "system", "popen"
-            ]
-        
-        if self.safe_strict_min_thresholds is None:
-            self.safe_strict_min_thresholds = {
-                "CWE-120": 0.95, "CWE-121": 0.95, "CWE-122": 0.95,
-                "CWE-415": 0.95, "CWE-416": 0.95,
-                "CWE-78": 0.99, "CWE-134": 0.95,
-                "CWE-22": 0.95, "CWE-367": 0.95, "CWE-330": 0.95,
-                "CWE-190": 0.95, "CWE-191": 0.95, "CWE-787": 0.95,
-                "CWE-467": 0.95
-            }
+    never_suppress_funcs: List[str] = field(default_factory=lambda: [
+        "strcpy", "strcat", "gets", "sprintf", "vsprintf",
+        "system", "popen"
+    ])
+    safe_strict_min_thresholds: Dict[str, float] = field(default_factory=lambda: {
+        "CWE-120": 0.95, "CWE-121": 0.95, "CWE-122": 0.95,
+        "CWE-415": 0.95, "CWE-416": 0.95,
+        "CWE-78": 0.99, "CWE-134": 0.95,
+        "CWE-22": 0.95, "CWE-367": 0.95, "CWE-330": 0.95,
+        "CWE-190": 0.95, "CWE-191": 0.95, "CWE-787": 0.95,
+        "CWE-467": 0.95
+    })
 
+@lru_cache(maxsize=1)
 def get_config() -> Config:
-    """Get application configuration from environment variables."""
+    """
+    Get application configuration from environment variables.
+    
+    The environment is read once per process; call ``get_config.cache_clear()``
+    after changing environment variables to pick up new values.
+    """
     return Config(
         # API Configuration
         api_token=os.getenv("SAFECODE_API_TOKEN", "test-token"),
         host=os.getenv("SAFECODE_HOST", "0.0.0.0"),
         port=int(os.getenv("SAFECODE_PORT", "8001")),
+        workers=int(os.getenv("SAFECODE_WORKERS", "1")),
         
         # Analyzer Configuration
         analyzer=os.getenv("ANALYZER", "flawfinder"),
         flawfinder_path=os.getenv("FLAWFINDER_PATH", "flawfinder"),
         flawfinder_max_findings=int(os.getenv("FLAWFINDER_MAX_FINDINGS", "1000")),
         flawfinder_timeout=int(os.getenv("FLAWFINDER_TIMEOUT", "60")),
+        analyzer_jobs=int(os.getenv("ANALYZER_JOBS", "4")),
         
         # Semgrep Configuration (legacy)
         semgrep_timeout=int(os.getenv("SEMGREP_TIMEOUT", "60")),
         semgrep_jobs=int(os.getenv("SEMGREP_JOBS", "4")),
         semgrep_max_findings=int(os.getenv("SEMGREP_MAX_FINDINGS", "250")),
         semgrep_max_target_bytes=int(os.getenv("SEMGREP_MAX_TARGET_BYTES", "2000000")),
+        semgrep_cache_dir=os.getenv("SEMGREP_CACHE_DIR", ""),
         
         # Response Limits
         safe_max_findings_response=int(os.getenv("SAFE_MAX_FINDINGS_RESPONSE", "200")),
         safe_max_inline_code_chars=int(os.getenv("SAFE_MAX_INLINE_CODE_CHARS", "20000")),
         safe_max_snippet_chars=int(os.getenv("SAFE_MAX_SNIPPET_CHARS", "600")),
+        safe_max_request_bytes=int(os.getenv("SAFE_MAX_REQUEST_BYTES", "131072")),
         
         # Rate Limiting
         rate_limit_requests=int(os.getenv("RATE_LIMIT_REQUESTS", "100")),
@@ -98,28 +118,98 @@ def get_config() -> Config:
         enable_gpt=os.getenv("ENABLE_GPT", "false").lower() == "true",
         openai_api_key=os.getenv("OPENAI_API_KEY", ""),
         openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        openai_batch_poll_interval=int(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "30")),
+        openai_concurrency=int(os.getenv("OPENAI_CONCURRENCY", "4")),
+        openai_max_tokens_per_call=int(os.getenv("OPENAI_MAX_TOKENS_PER_CALL", "12000")),
+        ai_cache_capacity=int(os.getenv("AI_CACHE_CAPACITY", "50000")),
+        ai_cache_ttl_seconds=int(os.getenv("AI_CACHE_TTL_SECONDS", "604800")),
         
         # Caching
         cache_ttl_seconds=int(os.getenv("CACHE_TTL_SECONDS", "120")),
+        cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+        scan_cache_capacity=int(os.getenv("SCAN_CACHE_CAPACITY", "1024")),
+        telemetry_refresh_seconds=float(os.getenv("TELEMETRY_REFRESH_SECONDS", "1.0")),
+        health_refresh_seconds=float(os.getenv("HEALTH_REFRESH_SECONDS", "30.0")),
+        
+        # Compression
+        gzip_min_size=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+        gzip_compress_level=int(os.getenv("GZIP_COMPRESS_LEVEL", "1")),
         
         # Logging
         log_level=os.getenv("LOG_LEVEL", "info"),
     )
 
-def validate_config(config: Config) -> List[str]:
-    """Validate configuration and return list of errors."""
-    errors = []
-    
+def _check_api_token(config: Config) -> Optional[str]:
+    """Require an API token."""
     if not config.api_token:
-        errors.append("SAFECODE_API_TOKEN not set")
+        return "SAFECODE_API_TOKEN not set"
+    return None
+
+def _check_analyzer(config: Config) -> Optional[str]:
+    """Require a supported analyzer."""
+    if config.analyzer not in ("flawfinder", "semgrep"):
+        return f"Invalid analyzer: {config.analyzer}. Must be 'flawfinder' or 'semgrep'"
+    return None
+
+def _check_openai_key(config: Config) -> Optional[str]:
+    """Require an OpenAI key when AI processing is enabled."""
+    if config.enable_gpt and not config.openai_api_key:
+        return "ENABLE_GPT=true but OPENAI_API_KEY not set"
+    return None
+
+def _check_port(config: Config) -> Optional[str]:
+    """Require a valid TCP port."""
+    if not 1 <= config.port <= 65535:
+        return f"Invalid port: {config.port}"
+    return None
+
+def _check_gzip_level(config: Config) -> Optional[str]:
+    """Require a zlib compression level."""
+    if not 1 <= config.gzip_compress_level <= 9:
+        return f"Invalid GZIP_COMPRESS_LEVEL: {config.gzip_compress_level}. Must be 1-9"
+    return None
+
+# Validation rules, run in order; each returns an error message or None
+_CHECKS: Tuple[Callable[[Config], Optional[str]], ...] = (
+    _check_api_token,
+    _check_analyzer,
+    _check_openai_key,
+    _check_port,
+    _check_gzip_level,
+)
+
+# Last fully validated Config and its errors; get_config() returns the same
+# instance until its cache is cleared, so repeat validations are free
+_last_validation: Optional[Tuple[Config, Tuple[str, ...]]] = None
+
+def validate_config(config: Config, fail_fast: bool = False) -> List[str]:
+    """
+    Validate configuration and return list of errors.
     
-    if config.analyzer not in ["flawfinder", "semgrep"]:
-        errors.append(f"Invalid analyzer: {config.analyzer}. Must be 'flawfinder' or 'semgrep'")
+    Args:
+        config: Configuration to validate
+        fail_fast: Stop at the first error instead of collecting all of them
+        
+    Returns:
+        List[str]: Error messages, at most one when fail_fast is set
+    """
+    global _last_validation
     
-    if config.enable_gpt and not config.openai_api_key:
-        errors.append("ENABLE_GPT=true but OPENAI_API_KEY not set")
+    if _last_validation is not None and _last_validation[0] is config:
+        errors = _last_validation[1]
+        return list(errors[:1] if fail_fast else errors)
     
-    if config.port < 1 or config.port > 65535:
-        errors.append(f"Invalid port: {config.port}")
+    errors = []
+    for check in _CHECKS:
+        error = check(config)
+        if error:
+            if fail_fast:
+                return [error]
+            errors.append(error)
     
+    _last_validation = (config, tuple(errors))
     return errors
+
+def validate_config_fast(config: Config) -> List[str]:
+    """Validate configuration, returning only the first error if any."""
+    return validate_config(config, fail_fast=True)
@@ -1,19 +1,39 @@
 """Flawfinder runner for C/C++ static analysis."""
 import subprocess
+import io
 import tempfile
 import os
 import json
 import logging
 import re
-from typing import List, Dict, Tuple, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import zlib
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .config import get_config
-from .utils import truncate_snippet, as_utf8
+from .utils import truncate_snippet
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Flawfinder arguments; source is read from stdin ("-")
+_SARIF_ARGS = ("--quiet", "--singleline", "--dataonly", "--columns", "--sarif", "-")
+_TEXT_ARGS = ("--quiet", "--singleline", "--dataonly", "-")
+
+# Patterns applied to every finding message
+_RISK_RE = re.compile(r'risk level (\d+)', re.I)
+_FUNC_RE = re.compile(r'(\w+)\s*\(')
+_CRITICAL_FUNC_RE = re.compile(r'strcpy|strcat|system', re.I)
+_HIGH_FUNC_RE = re.compile(r'sprintf|scanf', re.I)
+
+@dataclass(slots=True)
 class FlawfinderFinding:
     """Raw finding from Flawfinder."""
     file: str
@@ -28,69 +48,95 @@ class FlawfinderFinding:
 class FlawfinderRunner:
     """Runner for Flawfinder static analysis tool."""
     
+    __slots__ = ('config', 'tool_name')
+    
+    # Availability by tool path, shared by all runner instances
+    _availability_cache: Dict[str, bool] = {}
+    _availability_lock = threading.Lock()
+    
+    # CWE mapping for Flawfinder rules
+    cwe_mapping = {
+        "strcpy": "CWE-120",
+        "strcat": "CWE-120", 
+        "gets": "CWE-120",
+        "sprintf": "CWE-134",
+        "vsprintf": "CWE-134",
+        "scanf": "CWE-120",
+        "sscanf": "CWE-120",
+        "system": "CWE-78",
+        "popen": "CWE-78",
+        "execl": "CWE-78",
+        "execle": "CWE-78",
+        "execlp": "CWE-78",
+        "execv": "CWE-78",
+        "execve": "CWE-78",
+        "execvp": "CWE-78",
+        "access": "CWE-367",
+        "tmpnam": "CWE-377",
+        "mktemp": "CWE-377",
+        "rand": "CWE-330",
+        "srand": "CWE-330",
+        "memcpy": "CWE-787",
+        "memmove": "CWE-787",
+        "strncpy": "CWE-120",
+        "strncat": "CWE-122",
+        "fgets": "CWE-120",
+        "fscanf": "CWE-120",
+        "printf": "CWE-134",
+        "fprintf": "CWE-134",
+        "snprintf": "CWE-134",
+        "vsnprintf": "CWE-134",
+        "strlen": "CWE-476",
+        "open": "CWE-22",
+        "fopen": "CWE-22",
+        "readlink": "CWE-22",
+        "malloc": "CWE-190",
+        "realloc": "CWE-190",
+        "free": "CWE-415"
+    }
+    # Any mapped function name as a whole word, longest names first
+    _cwe_func_re = re.compile(
+        r'\b(?:' + '|'.join(map(re.escape, sorted(cwe_mapping, key=len, reverse=True))) + r')\b',
+        re.I
+    )
+    
+    # Severity mapping
+    severity_map = {
+        5: "CRITICAL",
+        4: "HIGH", 
+        3: "MEDIUM",
+        2: "MEDIUM",
+        1: "LOW",
+        0: "LOW"
+    }
+    
+    # High-risk functions that get confidence boost
+    high_risk_funcs = frozenset({
+        "strcpy", "strcat", "system", "popen", "tmpnam", 
+        "execl", "execle", "execlp", "execv", "execve", "execvp"
+    })
+    
     def __init__(self):
         self.config = get_config()
         self.tool_name = self.config.flawfinder_path
-        
-        # CWE mapping for Flawfinder rules
-        self.cwe_mapping = {
-            "strcpy": "CWE-120",
-            "strcat": "CWE-120", 
-            "gets": "CWE-120",
-            "sprintf": "CWE-134",
-            "vsprintf": "CWE-134",
-            "scanf": "CWE-120",
-            "sscanf": "CWE-120",
-            "system": "CWE-78",
-            "popen": "CWE-78",
-            "execl": "CWE-78",
-            "execle": "CWE-78",
-            "execlp": "CWE-78",
-            "execv": "CWE-78",
-            "execve": "CWE-78",
-            "execvp": "CWE-78",
-            "access": "CWE-367",
-            "tmpnam": "CWE-377",
-            "mktemp": "CWE-377",
-            "rand": "CWE-330",
-            "srand": "CWE-330",
-            "memcpy": "CWE-787",
-            "memmove": "CWE-787",
-            "strncpy": "CWE-120",
-            "strncat": "CWE-122",
-            "fgets": "CWE-120",
-            "fscanf": "CWE-120",
-            "printf": "CWE-134",
-            "fprintf": "CWE-134",
-            "snprintf": "CWE-134",
-            "vsnprintf": "CWE-134",
-            "strlen": "CWE-476",
-            "open": "CWE-22",
-            "fopen": "CWE-22",
-            "readlink": "CWE-22",
-            "malloc": "CWE-190",
-            "realloc": "CWE-190",
-            "free": "CWE-415"
-        }
-        
-        # Severity mapping
-        self.severity_map = {
-            5: "CRITICAL",
-            4: "HIGH", 
-            3: "MEDIUM",
-            2: "MEDIUM",
-            1: "LOW",
-            0: "LOW"
-        }
-        
-        # High-risk functions that get confidence boost
-        self.high_risk_funcs = {
-            "strcpy", "strcat", "system", "popen", "tmpnam", 
-            "execl", "execle", "execlp", "execv", "execve", "execvp"
-        }
 
     def check_availability(self) -> bool:
-        """Check if Flawfinder is available."""
+        """Check if Flawfinder is available, caching the result per tool path."""
+        with FlawfinderRunner._availability_lock:
+            available = FlawfinderRunner._availability_cache.get(self.tool_name)
+            if available is None:
+                available = self._probe_availability()
+                FlawfinderRunner._availability_cache[self.tool_name] = available
+            return available
+
+    @classmethod
+    def reset_availability_cache(cls):
+        """Forget cached availability results, e.g. after installing Flawfinder."""
+        with cls._availability_lock:
+            cls._availability_cache.clear()
+
+    def _probe_availability(self) -> bool:
+        """Run `flawfinder --version` to check that the tool can be executed."""
         try:
             result = subprocess.run(
                 [self.tool_name, "--version"],
@@ -114,54 +160,115 @@ class FlawfinderRunner:
             return [], False
             
         try:
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.c',
-                delete=False,
-                encoding='utf-8'
-            ) as temp_file:
-                temp_file.write(as_utf8(code))
-                temp_file_path = temp_file.name
+            # Encode once: the bytes go to Flawfinder on stdin, snippets come
+            # from the decoded (sanitized) lines
+            payload = code.encode('utf-8', errors='replace')
+            source_lines = payload.decode('utf-8').split('\n')
+            basename = os.path.basename(filename)
             
             # Try SARIF output first, fallback to text
-            findings, success = self._run_sarif_scan(temp_file_path)
+            findings, success = self._run_sarif_scan(payload, basename, source_lines)
             if not success:
-                findings, success = self._run_text_scan(temp_file_path)
+                findings, success = self._run_text_scan(payload, basename, source_lines)
             
-            # Apply limits and truncation
-            if len(findings) > self.config.flawfinder_max_findings:
-                logger.warning(f"Truncating findings from {len(findings)} to {self.config.flawfinder_max_findings}")
-                findings = findings[:self.config.flawfinder_max_findings]
+            # Build at most one finding past the limit, just to detect truncation
+            max_findings = self.config.flawfinder_max_findings
+            findings = list(islice(findings, max_findings + 1))
+            if len(findings) > max_findings:
+                logger.warning(f"Truncating findings to {max_findings}")
+                del findings[max_findings:]
             
-            os.unlink(temp_file_path)
             return findings, success
             
         except Exception as e:
             logger.error(f"Error running Flawfinder: {e}")
             return [], False
 
-    def _run_sarif_scan(self, file_path: str) -> Tuple[List[Dict], bool]:
-        """Run Flawfinder with SARIF output."""
+    def run_scan_many(self, codes: Dict[str, str]) -> Tuple[Dict[str, List[Dict]], bool]:
+        """
+        Scan several files with a single Flawfinder process.
+        
+        Args:
+            codes: Mapping of filename to source code
+            
+        Returns:
+            Tuple[Dict[str, List[Dict]], bool]: Findings per filename and success flag
+        """
+        if not codes:
+            return {}, True
+        if not self.check_availability():
+            return {name: [] for name in codes}, False
+        
+        names = list(codes)
+        sources = [codes[name].encode('utf-8', errors='replace') for name in names]
+        source_lines = [payload.decode('utf-8').split('\n') for payload in sources]
+        basenames = [os.path.basename(name) for name in names]
+        
         try:
-            cmd = [
-                self.tool_name,
-                "--quiet",
-                "--singleline", 
-                "--dataonly",
-                "--columns",
-                "--sarif",
-                file_path
-            ]
+            with tempfile.TemporaryDirectory(prefix="safecode_ff_") as temp_dir:
+                # Index-based names keep SARIF URIs simple and unambiguous
+                paths = [f"{i}.c" for i in range(len(names))]
+                for path, payload in zip(paths, sources):
+                    with open(os.path.join(temp_dir, path), 'wb') as f:
+                        f.write(payload)
+                
+                result = subprocess.run(
+                    (self.tool_name, *_SARIF_ARGS[:-1], *paths),
+                    cwd=temp_dir,
+                    capture_output=True,
+                    timeout=self.config.flawfinder_timeout
+                )
+            
+            if result.returncode != 0 or not result.stdout.strip():
+                raise RuntimeError(result.stderr.decode('utf-8', errors='replace'))
+            
+            sarif_data = orjson.loads(result.stdout) if orjson is not None else json.loads(result.stdout)
+            index_by_uri = {path: i for i, path in enumerate(paths)}
+            results: Dict[str, List[Dict]] = {name: [] for name in names}
+            
+            for run in sarif_data.get("runs", []):
+                for sarif_result in run.get("results", []):
+                    uri = (sarif_result.get("locations", [{}])[0]
+                           .get("physicalLocation", {})
+                           .get("artifactLocation", {})
+                           .get("uri", ""))
+                    i = index_by_uri.get(uri)
+                    if i is None:
+                        continue
+                    finding = self._extract_finding_from_sarif(sarif_result, basenames[i], source_lines[i])
+                    if finding:
+                        results[names[i]].append(finding)
             
+        except Exception as e:
+            logger.warning(f"Batch Flawfinder scan failed, scanning files one by one: {e}")
+            results = {}
+            success = True
+            for name in names:
+                results[name], scanned = self.run_scan(codes[name], name)
+                success = success and scanned
+            return results, success
+        
+        max_findings = self.config.flawfinder_max_findings
+        for name, findings in results.items():
+            if len(findings) > max_findings:
+                logger.warning(f"Truncating findings for {name} from {len(findings)} to {max_findings}")
+                results[name] = findings[:max_findings]
+        
+        return results, True
+
+    def _run_sarif_scan(self, payload: bytes, basename: str, source_lines: List[str]) -> Tuple[Iterable[Dict], bool]:
+        """Run Flawfinder with SARIF output."""
+        try:
+            # Keep stdout as bytes; the JSON parser decodes it directly
             result = subprocess.run(
-                cmd,
+                (self.tool_name, *_SARIF_ARGS),
+                input=payload,
                 capture_output=True,
-                text=True,
                 timeout=self.config.flawfinder_timeout
             )
             
             if result.returncode == 0 and result.stdout.strip():
-                return self._parse_sarif_output(result.stdout, file_path)
+                return self._parse_sarif_output(result.stdout, basename, source_lines)
             else:
                 logger.debug("SARIF output not available, falling back to text")
                 return [], False
@@ -173,28 +280,20 @@ class FlawfinderRunner:
             logger.error(f"Error in SARIF scan: {e}")
             return [], False
 
-    def _run_text_scan(self, file_path: str) -> Tuple[List[Dict], bool]:
+    def _run_text_scan(self, payload: bytes, basename: str, source_lines: List[str]) -> Tuple[Iterable[Dict], bool]:
         """Run Flawfinder with text output."""
         try:
-            cmd = [
-                self.tool_name,
-                "--quiet",
-                "--singleline",
-                "--dataonly",
-                file_path
-            ]
-            
             result = subprocess.run(
-                cmd,
+                (self.tool_name, *_TEXT_ARGS),
+                input=payload,
                 capture_output=True,
-                text=True,
                 timeout=self.config.flawfinder_timeout
             )
             
             if result.returncode == 0:
-                return self._parse_text_output(result.stdout, file_path)
+                return self._parse_text_output(result.stdout, basename, source_lines)
             else:
-                logger.error(f"Flawfinder text scan failed: {result.stderr}")
+                logger.error(f"Flawfinder text scan failed: {result.stderr.decode('utf-8', errors='replace')}")
                 return [], False
                 
         except subprocess.TimeoutExpired:
@@ -204,50 +303,49 @@ class FlawfinderRunner:
             logger.error(f"Error in text scan: {e}")
             return [], False
 
-    def _parse_sarif_output(self, output: str, file_path: str) -> Tuple[List[Dict], bool]:
-        """Parse SARIF output from Flawfinder."""
+    def _parse_sarif_output(self, output: bytes, basename: str, source_lines: List[str]) -> Tuple[Iterator[Dict], bool]:
+        """Parse SARIF output from Flawfinder; findings are built lazily."""
         try:
-            sarif_data = json.loads(output)
-            findings = []
-            
-            for run in sarif_data.get("runs", []):
-                for result in run.get("results", []):
-                    finding = self._extract_finding_from_sarif(result, file_path)
-                    if finding:
-                        findings.append(finding)
-            
-            return findings, True
-            
+            sarif_data = orjson.loads(output) if orjson is not None else json.loads(output)
         except json.JSONDecodeError:
             logger.error("Failed to parse SARIF JSON output")
-            return [], False
-        except Exception as e:
-            logger.error(f"Error parsing SARIF: {e}")
-            return [], False
-
-    def _parse_text_output(self, output: str, file_path: str) -> Tuple[List[Dict], bool]:
-        """Parse text output from Flawfinder."""
-        findings = []
-        lines = output.strip().split('\n')
+            return iter(()), False
         
-        for line in lines:
-            if not line.strip():
+        return self._iter_sarif_findings(sarif_data, basename, source_lines), True
+
+    def _iter_sarif_findings(self, sarif_data: Dict, basename: str, source_lines: List[str]) -> Iterator[Dict]:
+        """Yield findings from parsed SARIF data."""
+        for run in sarif_data.get("runs", []):
+            for result in run.get("results", []):
+                finding = self._extract_finding_from_sarif(result, basename, source_lines)
+                if finding:
+                    yield finding
+
+    def _parse_text_output(self, output: bytes, basename: str, source_lines: List[str]) -> Tuple[Iterator[Dict], bool]:
+        """Parse text output from Flawfinder; findings are built lazily."""
+        return self._iter_text_findings(output, basename, source_lines), True
+
+    def _iter_text_findings(self, output: bytes, basename: str, source_lines: List[str]) -> Iterator[Dict]:
+        """Yield findings from raw text output, decoding only non-blank lines."""
+        for raw in io.BytesIO(output):
+            line = raw.rstrip()
+            if not line:
                 continue
                 
-            finding = self._extract_finding_from_text(line, file_path)
+            finding = self._extract_finding_from_text(line.decode('utf-8', errors='replace'), basename, source_lines)
             if finding:
-                findings.append(finding)
-        
-        return findings, True
+                yield finding
 
-    def _extract_finding_from_sarif(self, result: Dict, file_path: str) -> Optional[Dict]:
+    def _extract_finding_from_sarif(self, result: Dict, basename: str, source_lines: List[str]) -> Optional[Dict]:
         """Extract finding from SARIF result."""
         try:
             location = result.get("locations", [{}])[0]
             physical_location = location.get("physicalLocation", {})
             
-            line = physical_location.get("startLine", 1)
-            column = physical_location.get("startColumn", 1)
+            region = physical_location.get("region", {})
+            
+            line = region.get("startLine", 1)
+            column = region.get("startColumn", 1)
             
             message = result.get("message", {}).get("text", "")
             rule_id = result.get("ruleId", "")
@@ -265,10 +363,10 @@ class FlawfinderRunner:
             confidence = self._calculate_confidence(function, risk_level)
             
             # Get snippet
-            snippet = self._get_snippet(file_path, line)
+            snippet = self._get_snippet(source_lines, line)
             
             return {
-                "id": f"flawfinder_{line}_{column}_{hash(rule_id) % 10000}",
+                "id": f"flawfinder_{line}_{column}_{zlib.crc32(rule_id.encode()) & 0xFFFF:04x}",
                 "cwe_id": cwe_id,
                 "title": f"{rule_id} vulnerability",
                 "severity": self.severity_map.get(risk_level, "MEDIUM"),
@@ -276,7 +374,7 @@ class FlawfinderRunner:
                 "line": line,
                 "column": column,
                 "snippet": snippet,
-                "file": os.path.basename(file_path),
+                "file": basename,
                 "tool": "flawfinder",
                 "confidence": confidence,
                 "suppression_reason": None,
@@ -292,18 +390,17 @@ class FlawfinderRunner:
             logger.error(f"Error extracting SARIF finding: {e}")
             return None
 
-    def _extract_finding_from_text(self, line: str, file_path: str) -> Optional[Dict]:
+    def _extract_finding_from_text(self, line: str, basename: str, source_lines: List[str]) -> Optional[Dict]:
         """Extract finding from text output line."""
         try:
             # Parse text format: file:line:function:risk:message
             parts = line.split(':', 4)
-            if len(parts) < 4:
+            if len(parts) < 5:
                 return None
                 
-            filename, line_str, function, risk_str, *message_parts = parts
+            _, line_str, function, risk_str, message = parts
             line_num = int(line_str)
             risk_level = int(risk_str)
-            message = ':'.join(message_parts) if message_parts else ""
             
             # Extract rule from message or function
             rule = self._extract_rule_from_message(message, function)
@@ -315,10 +412,10 @@ class FlawfinderRunner:
             confidence = self._calculate_confidence(function, risk_level)
             
             # Get snippet
-            snippet = self._get_snippet(file_path, line_num)
+            snippet = self._get_snippet(source_lines, line_num)
             
             return {
-                "id": f"flawfinder_{line_num}_{hash(rule) % 10000}",
+                "id": f"flawfinder_{line_num}_{zlib.crc32(rule.encode()) & 0xFFFF:04x}",
                 "cwe_id": cwe_id,
                 "title": f"{rule} vulnerability",
                 "severity": self.severity_map.get(risk_level, "MEDIUM"),
@@ -326,7 +423,7 @@ class FlawfinderRunner:
                 "line": line_num,
                 "column": 1,  # Default column
                 "snippet": snippet,
-                "file": os.path.basename(file_path),
+                "file": basename,
                 "tool": "flawfinder",
                 "confidence": confidence,
                 "suppression_reason": None,
@@ -349,14 +446,14 @@ class FlawfinderRunner:
             return int(rule_id)
         
         # Look for risk level in message
-        risk_match = re.search(r'risk level (\d+)', message.lower())
+        risk_match = _RISK_RE.search(message)
         if risk_match:
             return int(risk_match.group(1))
         
         # Default based on function type
-        if any(func in message.lower() for func in ["strcpy", "strcat", "system"]):
+        if _CRITICAL_FUNC_RE.search(message):
             return 5
-        elif any(func in message.lower() for func in ["sprintf", "scanf"]):
+        elif _HIGH_FUNC_RE.search(message):
             return 4
         else:
             return 3
@@ -364,7 +461,7 @@ class FlawfinderRunner:
     def _extract_function_name(self, message: str) -> str:
         """Extract function name from message."""
         # Look for function call pattern
-        func_match = re.search(r'(\w+)\s*\(', message)
+        func_match = _FUNC_RE.search(message)
         if func_match:
             return func_match.group(1)
         return "unknown"
@@ -375,10 +472,10 @@ class FlawfinderRunner:
         if function and function != "unknown":
             return function
         
-        # Look for common patterns
-        for func in self.cwe_mapping.keys():
-            if func in message.lower():
-                return func
+        # Look for the first known function named in the message
+        func_match = self._cwe_func_re.search(message)
+        if func_match:
+            return func_match.group(0).lower()
         
         return "unknown_rule"
 
@@ -409,30 +506,65 @@ class FlawfinderRunner:
         
         return min(base_confidence, 0.95)
 
-    def _get_snippet(self, file_path: str, line_num: int) -> str:
+    def _get_snippet(self, lines: List[str], line_num: int) -> str:
         """Get code snippet around the finding line."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
             start_line = max(0, line_num - 2)
-            end_line = min(len(lines), line_num + 1)
             
-            snippet_lines = []
-            for i in range(start_line, end_line):
-                line_content = lines[i].rstrip() if i < len(lines) else ""
-                line_number = i + 1
-                marker = ">>> " if line_number == line_num else "    "
-                snippet_lines.append(f"{marker}{line_number:3d}: {line_content}")
-            
-            snippet = "\n".join(snippet_lines)
+            snippet = "\n".join(
+                f"{'>>> ' if line_number == line_num else '    '}{line_number:3d}: {line_content.rstrip()}"
+                for line_number, line_content in enumerate(lines[start_line:line_num + 1], start_line + 1)
+            )
             return truncate_snippet(snippet, self.config.safe_max_snippet_chars)
             
         except Exception as e:
             logger.error(f"Error getting snippet: {e}")
             return f"Line {line_num}: Unable to extract snippet"
 
+# Global Flawfinder runner instance
+_flawfinder_runner = None
+
+
+def get_flawfinder_runner() -> FlawfinderRunner:
+    """Get the global Flawfinder runner instance."""
+    global _flawfinder_runner
+    
+    if _flawfinder_runner is None:
+        _flawfinder_runner = FlawfinderRunner()
+    
+    return _flawfinder_runner
+
+
 def analyze(filename: str, code: str) -> Tuple[List[Dict], bool]:
     """Analyze code using Flawfinder."""
-    runner = FlawfinderRunner()
+    runner = get_flawfinder_runner()
     return runner.run_scan(code, filename)
+
+
+def analyze_many(codes: Dict[str, str]) -> Tuple[Dict[str, List[Dict]], bool]:
+    """Analyze several files using one Flawfinder process."""
+    runner = get_flawfinder_runner()
+    return runner.run_scan_many(codes)
+
+
+def analyze_parallel(files: Iterable[Tuple[str, str]]) -> List[Tuple[List[Dict], bool]]:
+    """
+    Analyze files concurrently, one Flawfinder process per file.
+    
+    Threads are enough here: each worker waits on its subprocess with the GIL
+    released.
+    
+    Args:
+        files: (filename, code) pairs
+        
+    Returns:
+        List[Tuple[List[Dict], bool]]: Results in input order
+    """
+    files = list(files)
+    if not files:
+        return []
+    
+    runner = get_flawfinder_runner()
+    workers = max(1, min(runner.config.analyzer_jobs, len(files)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: runner.run_scan(item[1], item[0]), files))
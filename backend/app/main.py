@@ -1,26 +1,33 @@
 """Main FastAPI application for SAFECode-Web backend."""
 import sys
 import time
+import asyncio
 import logging
-import json
-from typing import List, Dict, Optional
+import subprocess
+from itertools import islice
+from typing import Any, List, Dict, Optional, Tuple
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request, Response, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .config import get_config, validate_config
 from .models import (
-    ScanRequest, ScanResponse, HealthResponse, 
-    TelemetryData, Alert, AlertsResponse
+    Finding, ScanRequest, ScanResponse, HealthResponse, 
+    TelemetryData, Alert, AlertsResponse,
+    ScanSummary, PaginationInfo, RateLimitInfo, truncate_snippet_text
 )
 from .auth import require_auth, optional_auth
-from .rate_limit import check_rate_limit, add_rate_limit_headers
-from .telemetry import get_telemetry_collector, generate_alerts
+from .rate_limit import get_request_rate_limit
+from .telemetry import get_telemetry_collector, generate_alerts, refresh_telemetry_periodically
 from .baseline import BaselineManager
-from .utils import as_utf8, setup_utf8, setup_logging
+from .scan_cache import get_scan_cache, make_scan_key
+from .suppression import apply_suppression_with_summary
+from .utils import as_utf8, setup_utf8, setup_logging, create_scan_summary
 from .middleware import (
-    GzipMiddleware, CacheMiddleware, 
+    CacheMiddleware, RateLimitMiddleware, RequestSizeLimitMiddleware,
     UTF8SanitizationMiddleware, LoggingMiddleware
 )
 
@@ -42,7 +49,8 @@ if validation_errors:
 app = FastAPI(
     title="SAFECode-Web Backend",
     description="Security code analysis service with Flawfinder and AI-powered fixes",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -58,12 +66,27 @@ app.add_middleware(
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(UTF8SanitizationMiddleware)
 app.add_middleware(CacheMiddleware)
-app.add_middleware(GzipMiddleware)
+# Outside the cache so cached responses still consume a request and carry
+# the client's current rate limit headers
+app.add_middleware(RateLimitMiddleware)
+# Compress only responses big enough to benefit; level 1 keeps zlib off the hot path
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=config.gzip_min_size,
+    compresslevel=config.gzip_compress_level
+)
+# Added last so it is outermost: oversized bodies are rejected before any
+# other middleware buffers them
+app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=config.safe_max_request_bytes)
 
 # Initialize components
 telemetry = get_telemetry_collector()
 baseline_manager = BaselineManager()
 
+# Scans are compared with the baseline saved under (filename, BASELINE_BRANCH)
+BASELINE_BRANCH = "main"
+scan_cache = get_scan_cache()
+
 # Conditional analyzer import
 if config.analyzer == "flawfinder":
     from .flawfinder_runner import analyze as run_analyzer
@@ -74,25 +97,135 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# AI helpers, resolved once; the modules pull in the OpenAI SDK, so they are
+# only imported when AI processing is enabled
+if config.enable_gpt and config.openai_api_key:
+    from .ai import aprocess_findings_with_ai as ai_process_findings
+    from .code_fixer import afix_code_with_gpt as ai_fix_code
+else:
+    ai_process_findings = None
+    ai_fix_code = None
+
+# Analyzer status reported by /health, refreshed in the background
+_analyzer_available: bool = False
+_analyzer_version: str = "Unknown"
+
+def _probe_analyzer() -> Tuple[bool, str]:
+    """Run the analyzer's --version and return (available, version)."""
+    tool = config.flawfinder_path if analyzer_name == "flawfinder" else "semgrep"
+    try:
+        result = subprocess.run(
+            [tool, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return False, "Unknown"
+    
+    if result.returncode != 0:
+        return False, "Unknown"
+    return True, result.stdout.strip() or "Available"
+
+def _request_start(req: Request) -> float:
+    """Get the monotonic request start stamped by LoggingMiddleware, or now."""
+    return getattr(req.state, "start", None) or time.monotonic()
+
+async def _run_analyzer_cached(filename: str, code: str) -> Tuple[List[Dict], bool]:
+    """
+    Run the analyzer, reusing the findings of an identical earlier submission.
+    
+    Args:
+        filename: Submitted filename
+        code: Submitted source code
+        
+    Returns:
+        Tuple[List[Dict], bool]: Findings and success flag
+    """
+    key = make_scan_key(analyzer_name, _analyzer_version, filename, code)
+    findings = scan_cache.get(key)
+    if findings is not None:
+        return findings, True
+    
+    # Run off the event loop; the analyzer blocks on its subprocess
+    findings, success = await asyncio.to_thread(run_analyzer, filename, code)
+    if success:
+        scan_cache.put(key, findings)
+    return findings, success
+
+async def _refresh_analyzer_status(interval: float):
+    """Re-probe the analyzer every `interval` seconds until cancelled."""
+    global _analyzer_available, _analyzer_version
+    
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            _analyzer_available, _analyzer_version = await asyncio.to_thread(_probe_analyzer)
+        except Exception as e:
+            logger.error(f"Error probing analyzer: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Application startup event."""
     logger.info(f"SAFECode-Web backend starting with analyzer: {analyzer_name}")
     
-    # Check analyzer availability
-    if analyzer_name == "flawfinder":
-        from .flawfinder_runner import FlawfinderRunner
-        runner = FlawfinderRunner()
-        if not runner.check_availability():
-            logger.warning("Flawfinder not available - install with: pip install flawfinder")
-    else:
-        from .semgrep_runner import SemgrepRunner
-        runner = SemgrepRunner()
-        if not runner.check_availability():
-            logger.warning("Semgrep not available - install with: pip install semgrep")
+    # Probe once now; /health serves the cached status from then on
+    global _analyzer_available, _analyzer_version
+    _analyzer_available, _analyzer_version = await asyncio.to_thread(_probe_analyzer)
+    if not _analyzer_available:
+        logger.warning(f"{analyzer_name.capitalize()} not available - install with: pip install {analyzer_name}")
+    app.state.analyzer_status_task = asyncio.create_task(
+        _refresh_analyzer_status(config.health_refresh_seconds)
+    )
+    
+    # Keep a telemetry snapshot fresh so responses don't aggregate per request
+    app.state.telemetry_task = asyncio.create_task(
+        refresh_telemetry_periodically(config.telemetry_refresh_seconds)
+    )
     
     logger.info("SAFECode-Web backend started successfully")
 
+def _finding_model(finding: Dict) -> Finding:
+    """
+    Build a response Finding without revalidating analyzer output.
+    
+    model_construct skips validators, so the snippet is capped here.
+    
+    Args:
+        finding: Finding dictionary
+        
+    Returns:
+        Finding: Response model
+    """
+    return Finding.model_construct(**{
+        **finding,
+        'snippet': truncate_snippet_text(finding.get('snippet') or '')
+    })
+
+def _fast_json(payload: Any, status_code: int = 200) -> Response:
+    """
+    Serialize a response body straight to JSON bytes.
+
+    Pydantic models are encoded by pydantic-core without building an
+    intermediate dict; plain containers go through orjson.
+
+    Args:
+        payload: Pydantic model or JSON-compatible object
+        status_code: HTTP status code
+
+    Returns:
+        Response: JSON response
+    """
+    if hasattr(payload, "model_dump_json"):
+        content = payload.model_dump_json()
+    else:
+        content = orjson.dumps(
+            payload,
+            default=lambda o: o.model_dump(mode="json") if hasattr(o, "model_dump") else o.__dict__,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
 @app.post("/scan")
 async def scan_code(
     request: ScanRequest,
@@ -106,76 +239,63 @@ async def scan_code(
     
     This endpoint applies false-positive suppression rules and returns paginated results.
     """
-    start_time = time.time()
-    rate_limit_info = check_rate_limit(req)
+    start_time = _request_start(req)
+    rate_limit_info = get_request_rate_limit(req)
     
     try:
-        # Validate input
-        if not request.code.strip():
-            raise HTTPException(status_code=400, detail="Code cannot be empty")
-        
-        if len(request.code) > config.safe_max_inline_code_chars:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Code too long. Maximum {config.safe_max_inline_code_chars} characters allowed"
-            )
-        
         # Run analyzer
-        findings, success = run_analyzer(request.filename, request.code)
+        findings, success = await _run_analyzer_cached(request.filename, request.code)
         if not success:
             raise HTTPException(status_code=500, detail="Static analysis failed")
         
         # Apply AI post-processing if enabled
-        if config.enable_gpt and config.openai_api_key:
-            from .ai import adjust_findings_with_ai
-            findings = adjust_findings_with_ai(findings, request.code)
+        if ai_process_findings is not None:
+            findings = await ai_process_findings(findings, request.code)
         
-        # Apply false-positive suppression
-        from .suppression import apply_false_positive_suppression
-        findings = apply_false_positive_suppression(findings, request.code)
+        # Apply false-positive suppression, summarizing in the same pass
+        findings, summary, suppressed_count = apply_suppression_with_summary(findings, request.code)
         
         # Apply pagination
         total_findings = len(findings)
-        paginated_findings = findings[offset:offset + limit]
+        page_size = max(0, min(limit, total_findings - offset))
+        truncated = page_size < total_findings
         
-        # Create summary
-        from .utils import create_scan_summary
-        summary = create_scan_summary(findings)
-        
-        # Get baseline comparison
-        baseline = baseline_manager.get_baseline_comparison(
-            request.filename, findings
+        # Compare with the baseline saved for this file, if any; the file
+        # I/O runs in a worker thread
+        baseline = await baseline_manager.acompare_with_baseline(
+            request.filename, BASELINE_BRANCH, findings
         )
         
         # Update telemetry
-        scan_duration = time.time() - start_time
-        telemetry.record_scan_request(
+        scan_duration = time.monotonic() - start_time
+        telemetry.enqueue_scan_request(
             scan_duration,
             findings,
-            len([f for f in findings if f["status"] == "SUPPRESSED"]),
+            suppressed_count,
             False,  # timeout
-            len(paginated_findings) < len(findings)  # truncated
+            truncated,
+            cwe_counts=summary['by_cwe']
         )
         
         # Create response
-        response = ScanResponse(
-            findings=paginated_findings,
-            summary=summary,
-            pagination={
-                "limit": limit,
-                "offset": offset,
-                "total": total_findings
-            },
+        # Everything here is built by the backend itself, so skip revalidation
+        response = ScanResponse.model_construct(
+            findings=[_finding_model(f) for f in islice(findings, offset, offset + limit)],
+            summary=ScanSummary.model_construct(**summary),
+            pagination=PaginationInfo.model_construct(
+                limit=limit,
+                offset=offset,
+                total=total_findings
+            ),
             baseline=baseline,
-            rate_limit=rate_limit_info,
-            telemetry=telemetry.get_telemetry_data()
+            rate_limit=RateLimitInfo.model_construct(**rate_limit_info),
+            telemetry=telemetry.get_snapshot()
         )
         
-        # Add headers
-        response_obj = JSONResponse(content=response.dict())
-        add_rate_limit_headers(response_obj, rate_limit_info)
+        # Add headers; the rate limit ones come from RateLimitMiddleware
+        response_obj = _fast_json(response)
         
-        if len(paginated_findings) < len(findings):
+        if truncated:
             response_obj.headers["X-Truncated"] = "true"
         
         return response_obj
@@ -197,46 +317,39 @@ async def scan_code_raw(
     
     This endpoint returns all findings without applying false-positive suppression.
     """
-    start_time = time.time()
-    rate_limit_info = check_rate_limit(req)
+    start_time = _request_start(req)
+    rate_limit_info = get_request_rate_limit(req)
     
     try:
-        # Validate input
-        if not request.code.strip():
-            raise HTTPException(status_code=400, detail="Code cannot be empty")
-        
         # Run analyzer
-        findings, success = run_analyzer(request.filename, request.code)
+        findings, success = await _run_analyzer_cached(request.filename, request.code)
         if not success:
             raise HTTPException(status_code=500, detail="Static analysis failed")
         
         # Create summary
-        from .utils import create_scan_summary
         summary = create_scan_summary(findings)
         
         # Update telemetry
-        scan_duration = time.time() - start_time
-        telemetry.record_scan_request(scan_duration, findings, 0, False, False)
+        scan_duration = time.monotonic() - start_time
+        telemetry.enqueue_scan_request(
+            scan_duration, findings, 0, False, False, cwe_counts=summary['by_cwe']
+        )
         
         # Create response
-        response = ScanResponse(
-            findings=findings,
-            summary=summary,
-            pagination={
-                "limit": len(findings),
-                "offset": 0,
-                "total": len(findings)
-            },
+        response = ScanResponse.model_construct(
+            findings=[_finding_model(f) for f in findings],
+            summary=ScanSummary.model_construct(**summary),
+            pagination=PaginationInfo.model_construct(
+                limit=len(findings),
+                offset=0,
+                total=len(findings)
+            ),
             baseline=None,
-            rate_limit=rate_limit_info,
-            telemetry=telemetry.get_telemetry_data()
+            rate_limit=RateLimitInfo.model_construct(**rate_limit_info),
+            telemetry=telemetry.get_snapshot()
         )
         
-        # Add headers
-        response_obj = JSONResponse(content=response.dict())
-        add_rate_limit_headers(response_obj, rate_limit_info)
-        
-        return response_obj
+        return _fast_json(response)
         
     except HTTPException:
         raise
@@ -248,49 +361,12 @@ async def scan_code_raw(
 async def health_check():
     """Health check endpoint."""
     try:
-        # Check analyzer availability
-        if analyzer_name == "flawfinder":
-            from .flawfinder_runner import FlawfinderRunner
-            runner = FlawfinderRunner()
-            analyzer_available = runner.check_availability()
-            analyzer_version = "Unknown"
-            if analyzer_available:
-                try:
-                    import subprocess
-                    result = subprocess.run(
-                        [config.flawfinder_path, "--version"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0:
-                        analyzer_version = result.stdout.strip()
-                except:
-                    analyzer_version = "Available"
-        else:
-            from .semgrep_runner import SemgrepRunner
-            runner = SemgrepRunner()
-            analyzer_available = runner.check_availability()
-            analyzer_version = "Unknown"
-            if analyzer_available:
-                try:
-                    import subprocess
-                    result = subprocess.run(
-                        ["semgrep", "--version"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0:
-                        analyzer_version = result.stdout.strip()
-                except:
-                    analyzer_version = "Available"
-        
         return HealthResponse(
             status="healthy",
             analyzer=analyzer_name,
-            analyzer_available=analyzer_available,
-            analyzer_version=analyzer_version
+            analyzer_available=_analyzer_available,
+            analyzer_version=_analyzer_version,
+            semgrep_version=_analyzer_version if analyzer_name == "semgrep" and _analyzer_available else None
         )
         
     except Exception as e:
@@ -304,8 +380,8 @@ async def health_check():
 
 @app.get("/metrics")
 async def get_metrics():
-    """Get telemetry metrics."""
-    return telemetry.get_telemetry_data()
+    """Get telemetry metrics from the periodically refreshed snapshot."""
+    return Response(content=telemetry.get_snapshot_json(), media_type="application/json")
 
 @app.get("/alerts")
 async def get_alerts():
@@ -322,36 +398,25 @@ async def fix_code(
     Fix C code vulnerabilities automatically using GPT.
     This endpoint scans the code for vulnerabilities and returns the fixed version.
     """
-    start_time = time.time()
-    rate_limit_info = check_rate_limit(req)
+    start_time = _request_start(req)
+    rate_limit_info = get_request_rate_limit(req)
     
     try:
-        # Validate input
-        if not request.code.strip():
-            raise HTTPException(status_code=400, detail="Code cannot be empty")
-        
-        if len(request.code) > config.safe_max_inline_code_chars:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Code too long. Maximum {config.safe_max_inline_code_chars} characters allowed"
-            )
-        
         # Run analyzer
-        findings, success = run_analyzer(request.filename, request.code)
+        findings, success = await _run_analyzer_cached(request.filename, request.code)
         if not success:
             raise HTTPException(status_code=500, detail="Static analysis failed")
         
         # Apply AI fixes if enabled
-        if config.enable_gpt and config.openai_api_key:
-            from .code_fixer import fix_code_with_gpt
-            fixed_code, fix_details = fix_code_with_gpt(request.code, findings)
+        if ai_fix_code is not None:
+            fixed_code, fix_details = await ai_fix_code(request.code, findings)
         else:
             fixed_code = request.code
             fix_details = []
         
         # Update telemetry
-        scan_duration = time.time() - start_time
-        telemetry.record_scan_request(scan_duration, findings, 0, False, False)
+        scan_duration = time.monotonic() - start_time
+        telemetry.enqueue_scan_request(scan_duration, findings, 0, False, False)
         
         # Create response
         response = {
@@ -364,9 +429,7 @@ async def fix_code(
             "rate_limit": rate_limit_info
         }
         
-        response_obj = JSONResponse(content=response)
-        add_rate_limit_headers(response_obj, rate_limit_info)
-        return response_obj
+        return _fast_json(response)
         
     except HTTPException:
         raise
@@ -380,5 +443,8 @@ if __name__ == "__main__":
         "app.main:app",
         host=config.host,
         port=config.port,
-        reload=True
+        workers=config.workers,
+        loop="uvloop",
+        http="httptools",
+        log_level=config.log_level
     )
@@ -2,28 +2,83 @@
 
 import time
 import hashlib
-import gzip
-from typing import Dict, Any, Optional
-from fastapi import Request, Response
-from fastapi.responses import StreamingResponse
+import heapq
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import orjson
 import logging
 
 from .config import get_config
-from .utils import as_utf8, create_cache_key
+from .models import RateLimitInfo
+from .telemetry import get_telemetry_collector
+from .rate_limit import RATE_LIMIT_HEADER_PREFIX, check_rate_limit, rate_limit_headers
+from .utils import as_utf8, is_text_content_type
+
+
+# Header names and most header values repeat across responses
+_as_utf8_header = lru_cache(maxsize=2048)(as_utf8)
+
+
+def _query_param_name(pair: bytes) -> bytes:
+    """Get the raw name of a `name=value` query string pair."""
+    return pair.partition(b'=')[0]
+
+
+def _sanitize_headers(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Sanitize raw header pairs, keeping the list when nothing changes."""
+    sanitized = None
+    for index, (name, value) in enumerate(headers):
+        text = value.decode('latin-1')
+        sanitized_text = _as_utf8_header(text)
+        if sanitized_text != text:
+            if sanitized is None:
+                sanitized = list(headers)
+            sanitized[index] = (name, sanitized_text.encode('latin-1', errors='replace'))
+    return headers if sanitized is None else sanitized
+
+
+def _sanitize_body(body: bytes) -> bytes:
+    """Replace invalid UTF-8 in a text body, returning valid bodies untouched."""
+    # ASCII and valid UTF-8 bodies pass through untouched; only invalid ones
+    # pay for the decode/re-encode round-trip
+    if body.isascii():
+        return body
+    try:
+        body.decode('utf-8')
+        return body
+    except UnicodeDecodeError:
+        pass
+    
+    try:
+        return as_utf8(body.decode('utf-8', errors='replace')).encode('utf-8')
+    except Exception as e:
+        logging.warning(f"Failed to sanitize response body: {e}")
+        return body
 
 
 class SimpleCache:
-    """Simple in-memory cache with TTL."""
+    """Simple in-memory LRU cache with TTL."""
+    
+    # Sweep expired items once every this many sets
+    PURGE_EVERY = 128
     
-    def __init__(self, ttl_seconds: int = 120):
+    def __init__(self, ttl_seconds: int = 120, max_size: int = 1024):
         """
         Initialize cache.
         
         Args:
             ttl_seconds: Time to live in seconds
+            max_size: Maximum number of cached items
         """
         self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.max_size = max_size
+        self.cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._exp_heap: List[Tuple[float, str]] = []
+        self._sets = 0
     
     def get(self, key: str) -> Optional[Any]:
         """
@@ -35,330 +90,500 @@ class SimpleCache:
         Returns:
             Optional[Any]: Cached value or None
         """
-        if key in self.cache:
-            entry = self.cache[key]
-            if time.time() - entry['timestamp'] < self.ttl_seconds:
-                return entry['value']
-            else:
-                # Expired, remove it
-                del self.cache[key]
-        return None
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        
+        timestamp, value = entry
+        if time.monotonic() - timestamp >= self.ttl_seconds:
+            # Expired, remove it
+            del self.cache[key]
+            return None
+        
+        self.cache.move_to_end(key)
+        return value
     
     def set(self, key: str, value: Any):
         """
-        Set value in cache.
+        Set value in cache, evicting the least recently used items when full.
         
         Args:
             key: Cache key
             value: Value to cache
         """
-        self.cache[key] = {
-            'value': value,
-            'timestamp': time.time()
-        }
+        now = time.monotonic()
+        self.cache[key] = (now, value)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+        
+        heapq.heappush(self._exp_heap, (now + self.ttl_seconds, key))
+        self._sets += 1
+        if self._sets % self.PURGE_EVERY == 0:
+            self.purge_expired()
+    
+    def purge_expired(self):
+        """Remove expired items, visiting only heap entries that are due."""
+        now = time.monotonic()
+        heap = self._exp_heap
+        cache = self.cache
+        ttl = self.ttl_seconds
+        
+        while heap and heap[0][0] <= now:
+            _, key = heapq.heappop(heap)
+            # The key may have been re-set or evicted since this entry was pushed
+            entry = cache.get(key)
+            if entry is not None and entry[0] + ttl <= now:
+                del cache[key]
     
     def clear(self):
         """Clear all cached items."""
         self.cache.clear()
+        self._exp_heap.clear()
     
     def size(self) -> int:
         """Get number of cached items."""
         return len(self.cache)
 
 
-class GzipMiddleware:
-    """Gzip compression middleware."""
+class RequestSizeLimitMiddleware:
+    """Reject oversized request bodies before they are buffered or parsed."""
     
-    def __init__(self, min_size: int = 1024):
+    def __init__(self, app: ASGIApp, max_body_bytes: int):
         """
-        Initialize gzip middleware.
+        Initialize request size limit middleware.
         
         Args:
-            min_size: Minimum response size to compress (bytes)
+            app: Wrapped ASGI application
+            max_body_bytes: Largest accepted request body (0 disables the check)
         """
-        self.min_size = min_size
+        self.app = app
+        self.max_body_bytes = max_body_bytes
     
-    async def __call__(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
-        Process request and compress response if needed.
+        Answer 413 once the request body exceeds the limit.
+        
+        A larger declared Content-Length is rejected before anything is read.
+        Otherwise received bytes are counted, which also bounds chunked bodies:
+        when the total passes the limit, the 413 is sent, the app sees a
+        disconnect and anything it still sends is dropped.
         
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-            
-        Returns:
-            Response: Compressed or original response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        response = await call_next(request)
+        if scope["type"] != "http" or self.max_body_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
         
-        # Check if response should be compressed
-        if self._should_compress(response):
-            return await self._compress_response(response)
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_bytes:
+                    await self._reject(scope, receive, send)
+                    return
+                break
         
-        return response
-    
-    def _should_compress(self, response: Response) -> bool:
-        """Check if response should be compressed."""
-        # Don't compress if already compressed
-        if 'content-encoding' in response.headers:
-            return False
-        
-        # Check content type
-        content_type = response.headers.get('content-type', '')
-        if not any(ct in content_type.lower() for ct in ['json', 'text', 'xml', 'html']):
-            return False
-        
-        # Check response size
-        content_length = response.headers.get('content-length')
-        if content_length:
-            try:
-                size = int(content_length)
-                return size >= self.min_size
-            except ValueError:
-                pass
-        
-        return True
-    
-    async def _compress_response(self, response: Response) -> Response:
-        """Compress response content."""
-        try:
-            # Get response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            # Compress
-            compressed_body = gzip.compress(body)
-            
-            # Create new response
-            compressed_response = Response(
-                content=compressed_body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
-            )
-            
-            # Add compression headers
-            compressed_response.headers['content-encoding'] = 'gzip'
-            compressed_response.headers['content-length'] = str(len(compressed_body))
-            
-            return compressed_response
+        received = 0
+        rejected = False
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
             
-        except Exception as e:
-            logging.warning(f"Failed to compress response: {e}")
-            return response
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    rejected = True
+                    if not response_started:
+                        await self._reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+        
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        await self.app(scope, limited_receive, guarded_send)
+    
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        """Send the 413 response."""
+        response = ORJSONResponse(
+            {"detail": f"Request body too large. Maximum {self.max_body_bytes} bytes allowed"},
+            status_code=413
+        )
+        await response(scope, receive, send)
 
 
 class CacheMiddleware:
     """Caching middleware for scan results."""
     
-    def __init__(self, cache: SimpleCache):
+    # Only scan endpoints are cached
+    CACHED_PATHS = frozenset(('/scan', '/scan/raw'))
+    
+    # Response headers describing one particular response, never replayed
+    # (content-length is recomputed for the refreshed body)
+    UNCACHED_HEADERS = frozenset((b'content-length', b'x-response-time'))
+    
+    def __init__(self, app: ASGIApp, cache: Optional[SimpleCache] = None):
         """
         Initialize cache middleware.
         
         Args:
-            cache: Cache instance
+            app: Wrapped ASGI application
+            cache: Cache instance (defaults to the global cache)
         """
-        self.cache = cache
+        self.app = app
+        self.cache = cache if cache is not None else get_cache()
     
-    async def __call__(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
-        Process request with caching.
+        Serve cached scan responses, or pass through and cache successful ones.
+        
+        Response messages are forwarded as the app sends them; the body is
+        only collected alongside for the cache, never rebuilt into a Response.
         
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-            
-        Returns:
-            Response: Cached or fresh response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        # Only cache scan endpoints
-        if request.url.path not in ['/scan', '/scan/raw']:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] not in self.CACHED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        # Read the request body up front; it is part of the cache key
+        body_chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                await self.app(scope, receive, send)
+                return
+            body_chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(body_chunks)
         
-        # Create cache key
-        cache_key = self._create_cache_key(request)
+        cache_key = self._create_cache_key(scope, body)
         
         # Check cache
         cached_response = self.cache.get(cache_key)
         if cached_response:
-            return Response(
-                content=cached_response['content'],
-                status_code=cached_response['status_code'],
-                headers=cached_response['headers'],
-                media_type=cached_response['media_type']
-            )
-        
-        # Get fresh response
-        response = await call_next(request)
-        
-        # Cache successful responses
-        if response.status_code == 200:
-            try:
-                # Get response body
-                body = b""
-                async for chunk in response.body_iterator:
-                    body += chunk
-                
-                # Cache response
-                self.cache.set(cache_key, {
-                    'content': body,
-                    'status_code': response.status_code,
-                    'headers': dict(response.headers),
-                    'media_type': response.media_type
-                })
-                
-                # Return response with body
-                return Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type
-                )
-                
-            except Exception as e:
-                logging.warning(f"Failed to cache response: {e}")
+            content = self._refresh_body(scope, cached_response['content'])
+            await send({
+                "type": "http.response.start",
+                "status": cached_response['status_code'],
+                "headers": cached_response['headers'] + [
+                    (b'content-length', str(len(content)).encode('latin-1'))
+                ]
+            })
+            await send({"type": "http.response.body", "body": content})
+            return
         
-        return response
+        # Replay the consumed body to the app
+        body_replayed = False
+        
+        async def replay_receive():
+            nonlocal body_replayed
+            if not body_replayed:
+                body_replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        start_message = None
+        response_chunks = []
+        
+        async def send_and_cache(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body" and start_message["status"] == 200:
+                response_chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Cache successful responses; rate limit headers are
+                    # per client and request, so RateLimitMiddleware adds
+                    # fresh ones to every response instead
+                    self.cache.set(cache_key, {
+                        'content': b"".join(response_chunks),
+                        'status_code': 200,
+                        'headers': [
+                            (name, value) for name, value in start_message.get("headers", [])
+                            if name not in self.UNCACHED_HEADERS
+                            and not name.startswith(RATE_LIMIT_HEADER_PREFIX)
+                        ]
+                    })
+            await send(message)
+        
+        await self.app(scope, replay_receive, send_and_cache)
+    
+    def _refresh_body(self, scope: Scope, content: bytes) -> bytes:
+        """
+        Replace the per-request fields of a cached scan response body.
+        
+        The findings are shared by identical submissions, but rate_limit
+        belongs to the current client and telemetry to the current moment.
+        
+        Args:
+            scope: ASGI connection scope
+            content: Cached JSON body
+            
+        Returns:
+            bytes: JSON body with current rate_limit and telemetry
+        """
+        payload = orjson.loads(content)
+        rate_limit_info = scope.get("state", {}).get("rate_limit")
+        if rate_limit_info is not None:
+            payload['rate_limit'] = {name: rate_limit_info[name] for name in RateLimitInfo.model_fields}
+        payload['telemetry'] = orjson.loads(get_telemetry_collector().get_snapshot_json())
+        return orjson.dumps(payload)
     
-    def _create_cache_key(self, request: Request) -> str:
+    def _create_cache_key(self, scope: Scope, body: bytes) -> str:
         """Create cache key from request."""
-        # Get request body
-        body = b""
+        # Credentials are part of the key so /scan/raw hits still require them
+        authorization = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+        
+        # Hash the raw body bytes; decoding and sanitizing it first only to
+        # re-encode it cost more than the hash itself
+        digest = hashlib.sha256()
+        digest.update(scope["path"].encode('utf-8'))
+        digest.update(b'|')
+        query_string = scope.get("query_string", b"")
+        if b'&' in query_string:
+            # Order parameters by name so reordered queries share an entry;
+            # the stable sort keeps repeated names in order (the last one wins)
+            for pair in sorted(query_string.split(b'&'), key=_query_param_name):
+                digest.update(pair)
+                digest.update(b'&')
+        else:
+            digest.update(query_string)
+        digest.update(b'|')
+        digest.update(authorization)
+        digest.update(b'|')
+        digest.update(body)
+        return digest.hexdigest()
+
+
+class RateLimitMiddleware:
+    """Apply per-client rate limits, including to responses served from cache."""
+    
+    # Endpoints that consume a request from the client's allowance
+    RATE_LIMITED_PATHS = frozenset(('/scan', '/scan/raw', '/fix'))
+    
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize rate limit middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Consume a request from the client's allowance, answering 429 when empty.
+        
+        The rate limit info is stored on the request state for the handlers,
+        and current X-RateLimit-* headers replace any on the response.
+        
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.RATE_LIMITED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+        
         try:
-            body = request.body()
-        except:
-            pass
+            rate_limit_info = check_rate_limit(Request(scope))
+        except HTTPException as e:
+            response = ORJSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
         
-        # Create key from URL and body
-        key_parts = [
-            request.url.path,
-            str(request.query_params),
-            body.decode('utf-8', errors='replace') if body else ""
-        ]
+        scope.setdefault("state", {})["rate_limit"] = rate_limit_info
+        headers = rate_limit_headers(rate_limit_info)
         
-        return create_cache_key(*key_parts)
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        (name, value) for name, value in message.get("headers", [])
+                        if not name.startswith(RATE_LIMIT_HEADER_PREFIX)
+                    ] + headers
+                }
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
 
 
 class UTF8SanitizationMiddleware:
     """UTF-8 sanitization middleware."""
     
-    async def __call__(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
         """
-        Process request with UTF-8 sanitization.
+        Initialize UTF-8 sanitization middleware.
         
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-            
-        Returns:
-            Response: Sanitized response
+            app: Wrapped ASGI application
         """
-        # Process request
-        response = await call_next(request)
-        
-        # Sanitize response headers
-        sanitized_headers = {}
-        for key, value in response.headers.items():
-            sanitized_key = as_utf8(key)
-            sanitized_value = as_utf8(value)
-            sanitized_headers[sanitized_key] = sanitized_value
-        
-        # Get response body
-        body = b""
-        async for chunk in response.body_iterator:
-            body += chunk
-        
-        # Sanitize response body if it's text
-        content_type = response.headers.get('content-type', '')
-        if any(ct in content_type.lower() for ct in ['json', 'text', 'xml', 'html']):
-            try:
-                body_text = body.decode('utf-8', errors='replace')
-                sanitized_text = as_utf8(body_text)
-                body = sanitized_text.encode('utf-8')
-            except Exception as e:
-                logging.warning(f"Failed to sanitize response body: {e}")
-        
-        # Return sanitized response
-        return Response(
-            content=body,
-            status_code=response.status_code,
-            headers=sanitized_headers,
-            media_type=response.media_type
-        )
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Sanitize response headers and text bodies to valid UTF-8.
+        
+        Only text responses are collected; other bodies stream through.
+        
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        body_chunks = []
+        
+        async def send_sanitized(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                message["headers"] = _sanitize_headers(message.get("headers", []))
+                content_type = b""
+                for name, value in message["headers"]:
+                    if name.lower() == b"content-type":
+                        content_type = value
+                        break
+                if not is_text_content_type(content_type.decode('latin-1')):
+                    await send(message)
+                    return
+                # Hold the start until the body is known, it may change length
+                start_message = message
+                return
+            
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            
+            body_chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = _sanitize_body(b"".join(body_chunks))
+            start_message["headers"] = [
+                (name, str(len(body)).encode('latin-1') if name.lower() == b"content-length" else value)
+                for name, value in start_message["headers"]
+            ]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_sanitized)
 
 
 class LoggingMiddleware:
     """Request logging middleware."""
     
-    def __init__(self):
-        """Initialize logging middleware."""
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize logging middleware.
+        
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
         self.logger = logging.getLogger(__name__)
     
-    async def __call__(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
-        Process request with logging.
+        Log requests and responses and add an X-Response-Time header.
         
         Args:
-            request: FastAPI request
-            call_next: Next middleware/endpoint
-            
-        Returns:
-            Response: Response with logging
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
-        start_time = time.time()
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        self.logger.info(f"Request: {request.method} {request.url.path}")
-        
-        # Process request
-        response = await call_next(request)
+        # Stamp the start once; handlers read it back as request.state.start
+        start_time = time.monotonic()
+        scope.setdefault("state", {})["start"] = start_time
         
-        # Calculate duration
-        duration = time.time() - start_time
+        # Only build log arguments when INFO is on
+        log_enabled = self.logger.isEnabledFor(logging.INFO)
+        method = scope["method"]
+        path = scope["path"]
         
-        # Log response
-        self.logger.info(
-            f"Response: {response.status_code} - {duration:.3f}s - {request.method} {request.url.path}"
-        )
+        # Log request
+        if log_enabled:
+            self.logger.info("Request: %s %s", method, path)
         
-        # Add timing header
-        response.headers['X-Response-Time'] = f"{duration:.3f}s"
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                duration = time.monotonic() - start_time
+                
+                # Log response
+                if log_enabled:
+                    self.logger.info(
+                        "Response: %d - %.3fs - %s %s",
+                        message["status"], duration, method, path
+                    )
+                
+                # Add timing header
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-response-time", f"{duration:.3f}s".encode('latin-1'))
+                ]
+            await send(message)
         
-        return response
-
-
-# Global cache instance
-_cache = None
+        await self.app(scope, receive, send_timed)
 
 
+@lru_cache(maxsize=1)
 def get_cache() -> SimpleCache:
     """Get the global cache instance."""
-    global _cache
-    
-    if _cache is None:
-        config = get_config()
-        _cache = SimpleCache(ttl_seconds=config.cache_ttl_seconds)
-    
-    return _cache
+    config = get_config()
+    return SimpleCache(
+        ttl_seconds=config.cache_ttl_seconds,
+        max_size=config.cache_max_entries
+    )
 
 
-def get_gzip_middleware() -> GzipMiddleware:
-    """Get gzip middleware instance."""
-    return GzipMiddleware(min_size=1024)
+def get_cache_middleware(app: ASGIApp) -> CacheMiddleware:
+    """Get cache middleware instance wrapping `app`."""
+    cache = get_cache()
+    return CacheMiddleware(app, cache)
 
 
-def get_cache_middleware() -> CacheMiddleware:
-    """Get cache middleware instance."""
-    cache = get_cache()
-    return CacheMiddleware(cache)
+def get_utf8_middleware(app: ASGIApp) -> UTF8SanitizationMiddleware:
+    """Get UTF-8 sanitization middleware instance wrapping `app`."""
+    return UTF8SanitizationMiddleware(app)
 
 
-def get_utf8_middleware() -> UTF8SanitizationMiddleware:
-    """Get UTF-8 sanitization middleware instance."""
-    return UTF8SanitizationMiddleware()
+def get_logging_middleware(app: ASGIApp) -> LoggingMiddleware:
+    """Get logging middleware instance wrapping `app`."""
+    return LoggingMiddleware(app)
 
 
-def get_logging_middleware() -> LoggingMiddleware:
-    """Get logging middleware instance."""
-    return LoggingMiddleware()
+def get_rate_limit_middleware(app: ASGIApp) -> RateLimitMiddleware:
+    """Get rate limit middleware instance wrapping `app`."""
+    return RateLimitMiddleware(app)
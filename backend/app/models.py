@@ -1,10 +1,46 @@
 """Pydantic models for SAFECode-Web API."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from enum import Enum
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import re
 
+from .config import get_config
+
+# Allowed characters in submitted filenames
+_FILENAME_RE = re.compile(r'^[a-zA-Z0-9._\-/\\]+$')
+
+
+def truncate_snippet_text(snippet: str) -> str:
+    """
+    Truncate a snippet to config.safe_max_snippet_chars.
+    
+    Cuts on line boundaries where possible. Shared by the Finding validator
+    and handlers that build findings with model_construct.
+    
+    Args:
+        snippet: Code snippet
+        
+    Returns:
+        str: Original or truncated snippet
+    """
+    config = get_config()
+    if len(snippet) <= config.safe_max_snippet_chars:
+        return snippet
+    
+    # Try to cut on line boundaries, keeping a running length
+    limit = config.safe_max_snippet_chars - 3
+    parts = []
+    total = 0
+    for line in snippet.split('\n'):
+        total += len(line) + 1
+        if total > limit:
+            break
+        parts.append(line)
+    if parts:
+        return '\n'.join(parts).rstrip() + "..."
+    return snippet[:limit] + "..."
+
 
 class FindingStatus(str, Enum):
     """Status of a security finding."""
@@ -29,6 +65,9 @@ class Confidence(str, Enum):
 
 class Finding(BaseModel):
     """A security finding from static analysis."""
+    # Analyzers emit plain strings; keep them as such rather than enum members
+    model_config = ConfigDict(use_enum_values=True)
+    
     id: str = Field(..., description="Unique identifier for the finding")
     cwe_id: str = Field(..., description="CWE identifier")
     title: str = Field(..., description="Short title describing the issue")
@@ -38,39 +77,31 @@ class Finding(BaseModel):
     snippet: str = Field(..., description="Code snippet showing the issue")
     file: str = Field(..., description="File path where issue was found")
     tool: str = Field(default="semgrep", description="Tool that found the issue")
-    confidence: Confidence = Field(..., description="Confidence level")
+    confidence: Union[float, Confidence] = Field(
+        ..., description="Confidence score (0-1); analyzers that only rate confidence send a level"
+    )
     suppression_reason: Optional[str] = Field(None, description="Reason for suppression if applicable")
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
     
-    @validator('snippet')
+    @field_validator('snippet')
+    @classmethod
     def truncate_snippet(cls, v):
         """Truncate snippet to safe length."""
-        from .config import config
-        if len(v) > config.safe_max_snippet_chars:
-            # Try to cut on line boundaries
-            lines = v.split('\n')
-            result = ""
-            for line in lines:
-                if len(result + line + '\n') <= config.safe_max_snippet_chars - 3:
-                    result += line + '\n'
-                else:
-                    break
-            if result:
-                return result.rstrip() + "..."
-            else:
-                return v[:config.safe_max_snippet_chars - 3] + "..."
-        return v
+        return truncate_snippet_text(v)
 
 
 class ScanSummary(BaseModel):
     """Summary statistics for a scan."""
+    model_config = ConfigDict(use_enum_values=True)
+    
     totals_by_severity: Dict[Severity, int] = Field(default_factory=dict)
     totals_by_status: Dict[FindingStatus, int] = Field(default_factory=dict)
     suppression_rate: float = Field(..., description="Percentage of findings suppressed")
     by_cwe: Dict[str, int] = Field(default_factory=dict)
     by_status: Dict[FindingStatus, Dict[Severity, int]] = Field(default_factory=dict)
     
-    @validator('suppression_rate')
+    @field_validator('suppression_rate')
+    @classmethod
     def validate_suppression_rate(cls, v):
         """Ensure suppression rate is between 0 and 1."""
         return max(0.0, min(1.0, v))
@@ -85,10 +116,12 @@ class PaginationInfo(BaseModel):
 
 class BaselineReport(BaseModel):
     """Baseline comparison report."""
+    model_config = ConfigDict(use_enum_values=True)
+    
     active: Dict[Severity, int] = Field(default_factory=dict)
     suppressed: Dict[Severity, int] = Field(default_factory=dict)
     drift: Optional[float] = Field(None, description="Drift percentage from baseline")
-    severity_changes: Optional[Dict[Severity, Dict[str, int]]] = Field(None, description="Changes by severity")
+    severity_changes: Optional[Dict[Severity, Dict[str, Union[int, float]]]] = Field(None, description="Changes by severity")
 
 
 class TelemetryData(BaseModel):
@@ -125,18 +158,21 @@ class ScanRequest(BaseModel):
     code: str = Field(..., description="Source code to analyze")
     ruleset: Optional[str] = Field("p/security-audit", description="Semgrep ruleset to use")
     
-    @validator('filename')
+    @field_validator('filename')
+    @classmethod
     def validate_filename(cls, v):
         """Validate filename format."""
-        if not re.match(r'^[a-zA-Z0-9._\-/\\]+$', v):
+        if not _FILENAME_RE.match(v):
             raise ValueError("Invalid filename format")
         return v
     
-    @validator('code')
+    @field_validator('code')
+    @classmethod
     def validate_code(cls, v):
         """Validate code content."""
-        from .config import config
-        if not v.strip():
+        config = get_config()
+        # isspace() scans in place; strip() would copy the whole submission
+        if not v or v.isspace():
             raise ValueError("Code cannot be empty")
         if len(v) > config.safe_max_inline_code_chars:
             raise ValueError(f"Code too long (max {config.safe_max_inline_code_chars} chars)")
@@ -146,6 +182,9 @@ class ScanRequest(BaseModel):
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str = Field(..., description="Service status")
+    analyzer: Optional[str] = Field(None, description="Configured analyzer")
+    analyzer_available: bool = Field(False, description="Whether the analyzer responded to its last probe")
+    analyzer_version: Optional[str] = Field(None, description="Analyzer version from its last probe")
     semgrep_version: Optional[str] = Field(None, description="Semgrep version if available")
 
 
@@ -1,29 +1,64 @@
 """Rate limiting module for SAFECode-Web backend."""
 
+import math
 import time
+import heapq
+from functools import lru_cache
 from typing import Dict, List, Tuple
-from collections import defaultdict
 import threading
 
 from .config import get_config
 from .utils import get_client_ip
 
+# Pre-encoded (lower-case, as ASGI expects) rate limit header names
+RATE_LIMIT_HEADER_PREFIX = b"x-ratelimit-"
+_LIMIT_HEADER = b"x-ratelimit-limit"
+_REMAINING_HEADER = b"x-ratelimit-remaining"
+_RESET_HEADER = b"x-ratelimit-reset"
 
-class SlidingWindowRateLimiter:
-    """Sliding window rate limiter implementation."""
+
+class _BucketShard:
+    """One lock-guarded slice of the client buckets."""
+    
+    __slots__ = ('buckets', 'lock', 'expiry', 'calls')
+    
+    def __init__(self):
+        """Initialize an empty shard."""
+        # Each bucket is [tokens, last_refill_ns]
+        self.buckets: Dict[str, List[float]] = {}
+        self.lock = threading.Lock()
+        # Min-heap of (last_seen_ns, client_ip), one entry per bucket
+        self.expiry: List[Tuple[int, str]] = []
+        self.calls = 0
+
+
+class TokenBucketRateLimiter:
+    """Token bucket rate limiter with per-client buckets in lock-sharded maps."""
+    
+    # Number of bucket shards; must be a power of two
+    SHARDS = 16
+    
+    # Reclaim idle buckets once every this many checks per shard; must be a power of two
+    REAP_EVERY = 1024
     
     def __init__(self, max_requests: int, window_seconds: int):
         """
         Initialize rate limiter.
         
+        Each client may burst up to `max_requests` and regains tokens at
+        `max_requests` per `window_seconds`.
+        
         Args:
             max_requests: Maximum requests allowed per window
             window_seconds: Window size in seconds
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, List[float]] = defaultdict(list)
-        self.lock = threading.Lock()
+        self.window_ns = max(window_seconds, 1) * 1_000_000_000
+        self.refill_per_ns = max_requests / self.window_ns
+        self.shards: List[_BucketShard] = [_BucketShard() for _ in range(self.SHARDS)]
+        # Converts monotonic readings to wall-clock time for reset timestamps
+        self.epoch_offset_ns = time.time_ns() - time.monotonic_ns()
     
     def is_allowed(self, client_ip: str) -> Tuple[bool, Dict[str, int]]:
         """
@@ -33,40 +68,28 @@ class SlidingWindowRateLimiter:
             client_ip: Client IP address
             
         Returns:
-            Tuple[bool, Dict]: (allowed, rate limit info)
+            Tuple[bool, Dict]: (allowed, rate limit info); denied requests
+            also get retry_after, the seconds until a request is allowed
         """
-        current_time = time.time()
-        
-        with self.lock:
-            # Clean old requests outside the window
-            window_start = current_time - self.window_seconds
-            self.requests[client_ip] = [
-                req_time for req_time in self.requests[client_ip]
-                if req_time > window_start
-            ]
-            
-            # Check if under limit
-            current_requests = len(self.requests[client_ip])
-            allowed = current_requests < self.max_requests
-            
+        now = time.monotonic_ns()
+        shard = self.shards[hash(client_ip) & (self.SHARDS - 1)]
+        
+        with shard.lock:
+            bucket = self._refill(shard, client_ip, now)
+            allowed = bucket[0] >= 1
             if allowed:
-                # Add current request
-                self.requests[client_ip].append(current_time)
-                current_requests += 1
+                bucket[0] -= 1
+            tokens = bucket[0]
             
-            # Calculate reset time (next window start)
-            if self.requests[client_ip]:
-                reset_time = int(max(self.requests[client_ip]) + self.window_seconds)
-            else:
-                reset_time = int(current_time + self.window_seconds)
-            
-            rate_limit_info = {
-                'limit': self.max_requests,
-                'remaining': max(0, self.max_requests - current_requests),
-                'reset': reset_time
-            }
-            
-            return allowed, rate_limit_info
+            shard.calls += 1
+            if shard.calls & (self.REAP_EVERY - 1) == 0:
+                self._reap(shard, now)
+        
+        info = self._info(tokens, now)
+        if not allowed:
+            # Seconds until one token is back, not until the bucket is full
+            info['retry_after'] = max(1, math.ceil((1 - tokens) / self.refill_per_ns / 1_000_000_000))
+        return allowed, info
     
     def get_info(self, client_ip: str) -> Dict[str, int]:
         """
@@ -78,47 +101,66 @@ class SlidingWindowRateLimiter:
         Returns:
             Dict: Rate limit information
         """
-        current_time = time.time()
-        
-        with self.lock:
-            # Clean old requests outside the window
-            window_start = current_time - self.window_seconds
-            self.requests[client_ip] = [
-                req_time for req_time in self.requests[client_ip]
-                if req_time > window_start
-            ]
-            
-            current_requests = len(self.requests[client_ip])
-            
-            # Calculate reset time
-            if self.requests[client_ip]:
-                reset_time = int(max(self.requests[client_ip]) + self.window_seconds)
+        now = time.monotonic_ns()
+        shard = self.shards[hash(client_ip) & (self.SHARDS - 1)]
+        
+        with shard.lock:
+            tokens = self._refill(shard, client_ip, now)[0]
+        
+        return self._info(tokens, now)
+    
+    def _refill(self, shard: _BucketShard, client_ip: str, now: int) -> List[float]:
+        """Get the client's bucket topped up to `now` (caller holds the lock)."""
+        bucket = shard.buckets.get(client_ip)
+        if bucket is None:
+            bucket = shard.buckets[client_ip] = [float(self.max_requests), now]
+            heapq.heappush(shard.expiry, (now, client_ip))
+        else:
+            bucket[0] = min(self.max_requests, bucket[0] + (now - bucket[1]) * self.refill_per_ns)
+            bucket[1] = now
+        return bucket
+    
+    def _reap(self, shard: _BucketShard, now: int):
+        """
+        Drop buckets idle for a full window (caller holds the lock).
+        
+        Such a bucket has refilled completely, so it is indistinguishable from
+        the fresh one created on the client's next request. Heap entries of
+        buckets used since they were pushed are re-pushed at their last use.
+        """
+        cutoff = now - self.window_ns
+        expiry = shard.expiry
+        buckets = shard.buckets
+        
+        while expiry and expiry[0][0] <= cutoff:
+            _, client_ip = heapq.heappop(expiry)
+            bucket = buckets.get(client_ip)
+            if bucket is None:
+                continue
+            if bucket[1] <= cutoff:
+                del buckets[client_ip]
             else:
-                reset_time = int(current_time + self.window_seconds)
-            
-            return {
-                'limit': self.max_requests,
-                'remaining': max(0, self.max_requests - current_requests),
-                'reset': reset_time
-            }
+                heapq.heappush(expiry, (bucket[1], client_ip))
+    
+    def _info(self, tokens: float, now: int) -> Dict[str, int]:
+        """Build rate limit info; reset is when the bucket will be full again."""
+        missing = self.max_requests - tokens
+        refill_ns = int(missing / self.refill_per_ns) if missing > 0 and self.refill_per_ns else 0
+        return {
+            'limit': self.max_requests,
+            'remaining': int(tokens),
+            'reset': (now + self.epoch_offset_ns + refill_ns) // 1_000_000_000
+        }
 
 
-# Global rate limiter instance
-_rate_limiter = None
-
-
-def get_rate_limiter() -> SlidingWindowRateLimiter:
-    """Get the global rate limiter instance."""
-    global _rate_limiter
-    
-    if _rate_limiter is None:
-        config = get_config()
-        _rate_limiter = SlidingWindowRateLimiter(
-            max_requests=config.rate_limit_requests,
-            window_seconds=config.rate_limit_window
-        )
-    
-    return _rate_limiter
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Get the global rate limiter instance (called on every request)."""
+    config = get_config()
+    return TokenBucketRateLimiter(
+        max_requests=config.rate_limit_requests,
+        window_seconds=config.rate_limit_window
+    )
 
 
 def check_rate_limit(request) -> Dict[str, int]:
@@ -149,7 +191,7 @@ def check_rate_limit(request) -> Dict[str, int]:
                 'X-RateLimit-Limit': str(rate_limit_info['limit']),
                 'X-RateLimit-Remaining': str(rate_limit_info['remaining']),
                 'X-RateLimit-Reset': str(rate_limit_info['reset']),
-                'Retry-After': str(rate_limit_info['reset'] - int(time.time()))
+                'Retry-After': str(rate_limit_info['retry_after'])
             }
         )
     
@@ -172,14 +214,40 @@ def get_rate_limit_info(request) -> Dict[str, int]:
     return rate_limiter.get_info(client_ip)
 
 
-def add_rate_limit_headers(response, rate_limit_info: Dict[str, int]):
+def get_request_rate_limit(request) -> Dict[str, int]:
+    """
+    Get the rate limit info RateLimitMiddleware recorded for a request.
+    
+    Falls back to checking (and consuming) the limit here when the
+    middleware did not handle the request.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        Dict: Rate limit information
+        
+    Raises:
+        HTTPException: If rate limit exceeded
+    """
+    rate_limit_info = getattr(request.state, "rate_limit", None)
+    if rate_limit_info is None:
+        rate_limit_info = check_rate_limit(request)
+    return rate_limit_info
+
+
+def rate_limit_headers(rate_limit_info: Dict[str, int]) -> List[Tuple[bytes, bytes]]:
     """
-    Add rate limit headers to response.
+    Build raw (ASGI) rate limit header pairs.
     
     Args:
-        response: FastAPI response object
         rate_limit_info: Rate limit information
+        
+    Returns:
+        List[Tuple[bytes, bytes]]: Header name/value pairs
     """
-    response.headers['X-RateLimit-Limit'] = str(rate_limit_info['limit'])
-    response.headers['X-RateLimit-Remaining'] = str(rate_limit_info['remaining'])
-    response.headers['X-RateLimit-Reset'] = str(rate_limit_info['reset'])
+    return [
+        (_LIMIT_HEADER, str(rate_limit_info['limit']).encode('latin-1')),
+        (_REMAINING_HEADER, str(rate_limit_info['remaining']).encode('latin-1')),
+        (_RESET_HEADER, str(rate_limit_info['reset']).encode('latin-1')),
+    ]
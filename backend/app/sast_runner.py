@@ -6,7 +6,8 @@ import os
 import csv
 import json
 import logging
-from typing import List, Dict, Tuple, Optional
+import threading
+from typing import Iterable, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,8 @@ class FlawfinderRunner:
     def __init__(self):
         """Initialize Flawfinder runner."""
         self.tool_name = "flawfinder"
-        self.check_availability()
+        self.timeout = 60
+        self.available = self.check_availability()
 
     def check_availability(self) -> bool:
         """Check if Flawfinder is available."""
@@ -64,44 +66,20 @@ class FlawfinderRunner:
         Returns:
             Tuple of (vulnerabilities, success)
         """
-        if not self.check_availability():
+        if not self.available:
             return [], False
 
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(
-                mode='w',
-                suffix='.c',
-                delete=False,
-                encoding='utf-8'
-            ) as temp_file:
-                temp_file.write(code)
-                temp_file_path = temp_file.name
-
-            # Run Flawfinder with CSV output
-            cmd = [
-                self.tool_name,
-                "--csv",
-                "--context",
-                "--dataonly",
-                temp_file_path
-            ]
+            # Pipe the code through stdin; fall back to a temp file for
+            # Flawfinder builds that do not accept "-" as a target
+            returncode, vulnerabilities, stderr = self._run_flawfinder("-", code, filename, input=code)
+            if returncode != 0:
+                logger.debug(f"Flawfinder rejected stdin, retrying with a temp file: {stderr}")
+                returncode, vulnerabilities, stderr = self._run_flawfinder_on_file(code, filename)
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-
-            vulnerabilities = []
-            if result.returncode == 0:
-                vulnerabilities = self._parse_csv_output(result.stdout, code, filename)
-            else:
-                logger.error(f"Flawfinder failed: {result.stderr}")
-
-            # Clean up
-            os.unlink(temp_file_path)
+            if returncode != 0:
+                logger.error(f"Flawfinder failed: {stderr}")
+                vulnerabilities = []
 
             return vulnerabilities, True
 
@@ -109,14 +87,110 @@ class FlawfinderRunner:
             logger.error(f"Error running Flawfinder: {e}")
             return [], False
 
-    def _parse_csv_output(self, output: str, code: str, filename: str) -> List[Vulnerability]:
-        """Parse Flawfinder CSV output."""
+    def _run_flawfinder(self, target: str, code: str, filename: str,
+                        input: Optional[str] = None) -> Tuple[int, List[Vulnerability], str]:
+        """
+        Run Flawfinder with CSV output, parsing rows as they are produced.
+
+        Args:
+            target: File path to scan, or "-" to read the code from stdin
+            code: Source code, used for snippets
+            filename: Filename reported in findings
+            input: Text written to Flawfinder's stdin
+
+        Returns:
+            Tuple of (return code, vulnerabilities, stderr)
+        """
+        cmd = [
+            self.tool_name,
+            "--csv",
+            "--context",
+            "--dataonly",
+            target
+        ]
+
+        with subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
+        ) as proc:
+            timed_out = threading.Event()
+
+            def kill():
+                timed_out.set()
+                proc.kill()
+
+            # stdin and stderr are serviced on threads so neither pipe can
+            # fill up while stdout is being parsed
+            stderr_chunks: List[str] = []
+            write_errors: List[OSError] = []
+
+            def drain_stderr():
+                stderr_chunks.append(proc.stderr.read())
+
+            def write_stdin():
+                try:
+                    proc.stdin.write(input)
+                    proc.stdin.close()
+                except OSError as e:  # includes BrokenPipeError
+                    write_errors.append(e)
+
+            workers = [threading.Thread(target=drain_stderr, daemon=True)]
+            if input is not None:
+                workers.append(threading.Thread(target=write_stdin, daemon=True))
+
+            timer = threading.Timer(self.timeout, kill)
+            timer.start()
+            try:
+                for worker in workers:
+                    worker.start()
+                vulnerabilities = self._parse_csv_output(proc.stdout, code, filename)
+                for worker in workers:
+                    worker.join()
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, self.timeout)
+
+        stderr = "".join(stderr_chunks)
+        if write_errors:
+            # Flawfinder saw truncated input; report failure so the caller
+            # falls back to scanning a temp file
+            logger.warning(f"Failed to write code to Flawfinder stdin: {write_errors[0]}")
+            return returncode or 1, vulnerabilities, stderr or str(write_errors[0])
+
+        return returncode, vulnerabilities, stderr
+
+    def _run_flawfinder_on_file(self, code: str, filename: str) -> Tuple[int, List[Vulnerability], str]:
+        """Run Flawfinder on a temporary copy of the code."""
+        with tempfile.NamedTemporaryFile(
+            mode='w',
+            suffix='.c',
+            delete=False,
+            encoding='utf-8'
+        ) as temp_file:
+            temp_file.write(code)
+            temp_file_path = temp_file.name
+
+        try:
+            return self._run_flawfinder(temp_file_path, code, filename)
+        finally:
+            os.unlink(temp_file_path)
+
+    def _parse_csv_output(self, output: Iterable[str], code: str, filename: str) -> List[Vulnerability]:
+        """Parse Flawfinder CSV output lines, e.g. straight from the process pipe."""
         vulnerabilities = []
         lines = code.split('\n')
 
         try:
             # Parse CSV output
-            csv_reader = csv.reader(output.strip().split('\n'))
+            csv_reader = csv.reader(output)
             for row in csv_reader:
                 if len(row) >= 6:
                     try:
@@ -201,6 +275,20 @@ class FlawfinderRunner:
         return level_map.get(level, "medium")
 
 
+# Global runner instance; construction probes the Flawfinder binary
+_flawfinder_runner = None
+
+
+def get_flawfinder_runner() -> FlawfinderRunner:
+    """Get the global Flawfinder runner instance."""
+    global _flawfinder_runner
+    
+    if _flawfinder_runner is None:
+        _flawfinder_runner = FlawfinderRunner()
+    
+    return _flawfinder_runner
+
+
 def run_flawfinder_scan(code: str, filename: str = "code.c") -> Tuple[List[Dict], bool]:
     """
     Run Flawfinder scan and return findings in the expected format.
@@ -212,7 +300,7 @@ def run_flawfinder_scan(code: str, filename: str = "code.c") -> Tuple[List[Dict]
     Returns:
         Tuple of (findings, success)
     """
-    runner = FlawfinderRunner()
+    runner = get_flawfinder_runner()
     vulnerabilities, success = runner.run_scan(code, filename)
     
     if not success:
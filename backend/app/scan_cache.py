@@ -0,0 +1,119 @@
+"""Analyzer result cache for SAFECode-Web backend."""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .config import get_config
+
+
+def make_scan_key(analyzer: str, version: str, filename: str, code: str) -> str:
+    """
+    Build a cache key for an analyzer run.
+
+    Args:
+        analyzer: Analyzer name
+        version: Analyzer version, so upgrades invalidate old results
+        filename: Scanned filename (affects language detection and locations)
+        code: Scanned source code
+
+    Returns:
+        str: Cache key
+    """
+    digest = hashlib.sha256()
+    for part in (analyzer, version, filename):
+        data = part.encode('utf-8', errors='replace')
+        digest.update(len(data).to_bytes(4, 'little'))
+        digest.update(data)
+    digest.update(code.encode('utf-8', errors='replace'))
+    return digest.hexdigest()
+
+
+class ScanResultCache:
+    """Bounded LRU cache of analyzer findings with a TTL."""
+
+    def __init__(self, capacity: int = 1024, ttl_seconds: float = 120):
+        """
+        Initialize scan result cache.
+
+        Args:
+            capacity: Maximum number of cached scans
+            ttl_seconds: Time to live in seconds
+        """
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        # key -> (stored_at, findings tuple), in LRU order
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """
+        Get cached findings for a scan.
+
+        Callers get fresh copies of the finding dicts, since suppression and
+        AI post-processing update findings in place.
+
+        Args:
+            key: Cache key from make_scan_key
+
+        Returns:
+            Optional[List[Dict]]: Cached findings or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored_at, findings = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+
+        return [dict(finding) for finding in findings]
+
+    def put(self, key: str, findings: List[Dict]):
+        """
+        Cache the findings of a successful scan.
+
+        Args:
+            key: Cache key from make_scan_key
+            findings: Analyzer findings
+        """
+        if self.capacity <= 0:
+            return
+
+        entry = (time.monotonic(), tuple(dict(finding) for finding in findings))
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Clear all cached scans."""
+        with self.lock:
+            self.entries.clear()
+
+    def size(self) -> int:
+        """Get number of cached scans."""
+        return len(self.entries)
+
+
+# Global scan cache instance
+_scan_cache = None
+
+
+def get_scan_cache() -> ScanResultCache:
+    """Get the global scan result cache instance."""
+    global _scan_cache
+
+    if _scan_cache is None:
+        config = get_config()
+        _scan_cache = ScanResultCache(
+            capacity=config.scan_cache_capacity,
+            ttl_seconds=config.cache_ttl_seconds
+        )
+
+    return _scan_cache
@@ -2,13 +2,27 @@
 
 import subprocess
 import json
+import io
 import tempfile
 import os
+import shutil
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from pathlib import Path
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# json.JSONDecodeError is a ValueError; ijson raises its own JSONError
+_JSON_ERRORS = (ValueError,) if ijson is None else (ValueError, ijson.JSONError)
+
+# Semgrep exits 0 on a clean run and 1 when findings trip --error; anything
+# else (bad config, ruleset fetch failure, invalid target...) is an error
+_SEMGREP_OK_EXIT_CODES = (0, 1)
+
 from .config import get_config
 from .utils import as_utf8, generate_finding_id, parse_semgrep_severity, parse_semgrep_confidence, extract_cwe_from_message
 
@@ -21,8 +35,13 @@ class SemgrepRunner:
         self.config = get_config()
         self.logger = logging.getLogger(__name__)
         
-        # Check if semgrep is available
+        # Check if semgrep is available; the probe also records the version
+        self.version: Optional[str] = None
         self.semgrep_available = self._check_semgrep_availability()
+        
+        # Keep rule and AST caches across scans when a cache dir is configured
+        self.cache_dir = self.config.semgrep_cache_dir
+        self.env = self._build_env()
     
     def _check_semgrep_availability(self) -> bool:
         """Check if semgrep is available in PATH."""
@@ -34,7 +53,8 @@ class SemgrepRunner:
                 timeout=10
             )
             if result.returncode == 0:
-                self.logger.info(f"Semgrep available: {result.stdout.strip()}")
+                self.version = result.stdout.strip()
+                self.logger.info(f"Semgrep available: {self.version}")
                 return True
             else:
                 self.logger.warning(f"Semgrep not available: {result.stderr}")
@@ -44,25 +64,10 @@ class SemgrepRunner:
             return False
     
     def get_semgrep_version(self) -> Optional[str]:
-        """Get Semgrep version."""
-        if not self.semgrep_available:
-            return None
-        
-        try:
-            result = subprocess.run(
-                ['semgrep', '--version'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except Exception as e:
-            self.logger.error(f"Error getting Semgrep version: {e}")
-        
-        return None
+        """Get Semgrep version, as reported when the runner was created."""
+        return self.version if self.semgrep_available else None
     
-    def run_scan(self, filename: str, code: str, ruleset: str = "p/security-audit") -> Tuple[List[Dict], bool, bool]:
+    def run_scan(self, filename: str, code: str, ruleset: str = "p/security-audit") -> Tuple[List[Dict], bool, bool, bool]:
         """
         Run Semgrep scan on code.
         
@@ -72,13 +77,14 @@ class SemgrepRunner:
             ruleset: Semgrep ruleset to use
             
         Returns:
-            Tuple[List[Dict], bool, bool]: (findings, timeout, truncated)
+            Tuple[List[Dict], bool, bool, bool]: (findings, timeout, truncated, ok);
+            ok is False unless Semgrep ran to completion and its output parsed
         """
         if not self.semgrep_available:
             self.logger.error("Semgrep not available")
-            return [], False, False
+            return [], False, False, False
         
-        start_time = time.time()
+        start_time = time.monotonic()
         timeout_occurred = False
         truncated = False
         
@@ -94,17 +100,7 @@ class SemgrepRunner:
                 temp_file_path = temp_file.name
             
             # Build semgrep command
-            cmd = [
-                'semgrep',
-                '--json',
-                '--no-git-ignore',
-                '--no-ignore',
-                '--config', ruleset,
-                '--timeout', str(self.config.semgrep_timeout),
-                '--jobs', str(self.config.semgrep_jobs),
-                '--max-target-bytes', str(self.config.semgrep_max_target_bytes),
-                temp_file_path
-            ]
+            cmd = self._build_command(ruleset, temp_file_path)
             
             self.logger.debug(f"Running Semgrep: {' '.join(cmd)}")
             
@@ -112,38 +108,46 @@ class SemgrepRunner:
             result = subprocess.run(
                 cmd,
                 capture_output=True,
-                text=True,
-                timeout=self.config.semgrep_timeout + 5  # Add buffer
+                timeout=self.config.semgrep_timeout + 5,  # Add buffer
+                env=self.env
             )
             
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
             
             # Check for timeout
             if result.returncode == 124 or duration >= self.config.semgrep_timeout:
                 timeout_occurred = True
                 self.logger.warning(f"Semgrep scan timed out after {duration:.2f}s")
-                return [], timeout_occurred, truncated
+                return [], timeout_occurred, truncated, False
             
-            # Parse results
-            findings = self._parse_semgrep_output(result.stdout, result.stderr, filename)
+            if result.returncode not in _SEMGREP_OK_EXIT_CODES:
+                self.logger.error(
+                    f"Semgrep failed with exit code {result.returncode}: "
+                    f"{result.stderr.decode('utf-8', errors='replace')}"
+                )
+                return [], timeout_occurred, truncated, False
+            
+            # Parse results, stopping once the findings limit is reached
+            findings = self._parse_semgrep_output(
+                result.stdout, result.stderr, filename, self.config.semgrep_max_findings
+            )
             
             # Check if results were truncated
             if len(findings) >= self.config.semgrep_max_findings:
                 truncated = True
-                findings = findings[:self.config.semgrep_max_findings]
                 self.logger.warning(f"Semgrep results truncated to {self.config.semgrep_max_findings} findings")
             
             self.logger.info(f"Semgrep scan completed in {duration:.2f}s: {len(findings)} findings")
-            return findings, timeout_occurred, truncated
+            return findings, timeout_occurred, truncated, True
             
         except subprocess.TimeoutExpired:
             timeout_occurred = True
             self.logger.error("Semgrep scan timed out")
-            return [], timeout_occurred, truncated
+            return [], timeout_occurred, truncated, False
             
         except Exception as e:
             self.logger.error(f"Error running Semgrep: {e}")
-            return [], timeout_occurred, truncated
+            return [], timeout_occurred, truncated, False
             
         finally:
             # Clean up temporary file
@@ -153,42 +157,197 @@ class SemgrepRunner:
             except Exception as e:
                 self.logger.warning(f"Error cleaning up temp file: {e}")
     
-    def _parse_semgrep_output(self, stdout: str, stderr: str, filename: str) -> List[Dict]:
+    def run_scan_batch(self, files: List[Tuple[str, str]], ruleset: str = "p/security-audit") -> Tuple[Dict[str, List[Dict]], bool, bool]:
         """
-        Parse Semgrep JSON output.
+        Run one Semgrep scan over several files.
+        
+        Rule loading dominates Semgrep's runtime for small inputs, so the files
+        are written to a temporary directory and scanned in a single process.
         
         Args:
-            stdout: Semgrep stdout
-            stderr: Semgrep stderr
-            filename: Original filename
+            files: List of (filename, code) pairs
+            ruleset: Semgrep ruleset to use
             
         Returns:
-            List[Dict]: Parsed findings
+            Tuple[Dict[str, List[Dict]], bool, bool]: (findings by filename, timeout, truncated)
         """
-        findings = []
+        findings_by_file: Dict[str, List[Dict]] = {filename: [] for filename, _ in files}
+        
+        if not self.semgrep_available:
+            self.logger.error("Semgrep not available")
+            return findings_by_file, False, False
+        
+        if not files:
+            return findings_by_file, False, False
+        
+        start_time = time.monotonic()
+        timeout_occurred = False
+        truncated = False
+        temp_dir = os.path.realpath(tempfile.mkdtemp(prefix='safecode_'))
         
         try:
-            # Parse JSON output
-            data = json.loads(stdout)
+            # One subdirectory per file keeps duplicate basenames apart
+            targets: Dict[str, str] = {}
+            for index, (filename, code) in enumerate(files):
+                rel_path = os.path.join(str(index), os.path.basename(filename) or 'code.c')
+                file_path = os.path.join(temp_dir, rel_path)
+                os.mkdir(os.path.dirname(file_path))
+                with open(file_path, 'w', encoding='utf-8') as target_file:
+                    target_file.write(code)
+                targets[rel_path] = filename
+            
+            cmd = self._build_command(ruleset, temp_dir)
+            
+            self.logger.debug(f"Running Semgrep: {' '.join(cmd)}")
+            
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                timeout=self.config.semgrep_timeout + 5,  # Add buffer
+                env=self.env
+            )
             
-            # Extract results
-            results = data.get('results', [])
+            duration = time.monotonic() - start_time
             
-            for result in results:
-                finding = self._parse_finding(result, filename)
+            if result.returncode == 124 or duration >= self.config.semgrep_timeout:
+                timeout_occurred = True
+                self.logger.warning(f"Semgrep batch scan timed out after {duration:.2f}s")
+                return findings_by_file, timeout_occurred, truncated
+            
+            if result.stderr.strip():
+                self.logger.warning(f"Semgrep stderr: {result.stderr.decode('utf-8', errors='replace')}")
+            
+            # Map each result back to the filename it was submitted under
+            for item in self._iter_results(result.stdout):
+                filename = targets.get(os.path.relpath(item.get('path', ''), temp_dir))
+                if filename is None:
+                    continue
+                file_findings = findings_by_file[filename]
+                if len(file_findings) >= self.config.semgrep_max_findings:
+                    truncated = True
+                    continue
+                finding = self._parse_finding(item, filename)
                 if finding:
-                    findings.append(finding)
+                    file_findings.append(finding)
+            
+            if truncated:
+                self.logger.warning(f"Semgrep results truncated to {self.config.semgrep_max_findings} findings per file")
+            
+            total = sum(len(file_findings) for file_findings in findings_by_file.values())
+            self.logger.info(f"Semgrep batch scan of {len(files)} files completed in {duration:.2f}s: {total} findings")
+            return findings_by_file, timeout_occurred, truncated
+            
+        except subprocess.TimeoutExpired:
+            timeout_occurred = True
+            self.logger.error("Semgrep batch scan timed out")
+            return findings_by_file, timeout_occurred, truncated
             
-            # Log any errors
-            if stderr.strip():
-                self.logger.warning(f"Semgrep stderr: {stderr}")
+        except Exception as e:
+            self.logger.error(f"Error running Semgrep batch scan: {e}")
+            return findings_by_file, timeout_occurred, truncated
             
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Error parsing Semgrep JSON output: {e}")
-            self.logger.debug(f"Raw output: {stdout}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def _build_command(self, ruleset: str, target: str) -> List[str]:
+        """Build the Semgrep command line for a file or directory target."""
+        cmd = [
+            'semgrep',
+            '--json',
+            '--no-git-ignore',
+            '--no-ignore',
+            '--metrics=off',
+            '--disable-version-check',
+            '--config', ruleset,
+            '--timeout', str(self.config.semgrep_timeout),
+            '--jobs', str(self.config.semgrep_jobs),
+            '--max-target-bytes', str(self.config.semgrep_max_target_bytes)
+        ]
+        if self.cache_dir:
+            cmd += ['--experimental', '--registry-caching', '--ast-caching']
+        cmd.append(target)
+        return cmd
+    
+    def _build_env(self) -> Optional[Dict[str, str]]:
+        """
+        Build the Semgrep environment for the configured cache dir.
+        
+        Returns:
+            Optional[Dict[str, str]]: Environment, or None to inherit ours
+        """
+        if not self.cache_dir:
+            return None
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Semgrep cache dir unavailable, caching disabled: {e}")
+            self.cache_dir = ""
+            return None
+        
+        env = dict(os.environ)
+        env['XDG_CACHE_HOME'] = self.cache_dir
+        env['SEMGREP_SETTINGS_FILE'] = os.path.join(self.cache_dir, 'settings.yml')
+        env['SEMGREP_VERSION_CACHE_PATH'] = os.path.join(self.cache_dir, 'semgrep_version')
+        return env
+    
+    def _parse_semgrep_output(self, stdout: bytes, stderr: bytes, filename: str,
+                              max_findings: Optional[int] = None) -> List[Dict]:
+        """
+        Parse Semgrep JSON output.
+        
+        Args:
+            stdout: Semgrep stdout
+            stderr: Semgrep stderr
+            filename: Original filename
+            max_findings: Stop after this many findings (None for no limit)
+            
+        Returns:
+            List[Dict]: Parsed findings
+            
+        Raises:
+            ValueError: If the output is not valid Semgrep JSON
+        """
+        findings = []
+        
+        for result in self._iter_results(stdout):
+            finding = self._parse_finding(result, filename)
+            if finding:
+                findings.append(finding)
+                if max_findings is not None and len(findings) >= max_findings:
+                    break
+        
+        # Log any errors
+        if stderr.strip():
+            self.logger.warning(f"Semgrep stderr: {stderr.decode('utf-8', errors='replace')}")
         
         return findings
     
+    def _iter_results(self, stdout: bytes) -> Iterator[Dict]:
+        """
+        Iterate over the results array of Semgrep JSON output.
+        
+        With ijson installed the results are decoded one at a time, so callers
+        that stop early never build the rest of the document.
+        
+        Args:
+            stdout: Semgrep stdout
+            
+        Returns:
+            Iterator[Dict]: Semgrep result objects
+            
+        Raises:
+            ValueError: If the output is not valid JSON (ijson errors included)
+        """
+        try:
+            if ijson is not None:
+                yield from ijson.items(io.BytesIO(stdout), 'results.item', use_float=True)
+            else:
+                yield from json.loads(stdout).get('results', [])
+        except _JSON_ERRORS as e:
+            self.logger.debug(f"Raw output: {stdout[:2000]!r}")
+            raise ValueError(f"Error parsing Semgrep JSON output: {e}") from e
+    
     def _parse_finding(self, result: Dict, filename: str) -> Optional[Dict]:
         """
         Parse individual Semgrep finding.
@@ -293,7 +452,7 @@ def get_semgrep_runner() -> SemgrepRunner:
     return _semgrep_runner
 
 
-def run_semgrep_scan(filename: str, code: str, ruleset: str = "p/security-audit") -> Tuple[List[Dict], bool, bool]:
+def run_semgrep_scan(filename: str, code: str, ruleset: str = "p/security-audit") -> Tuple[List[Dict], bool, bool, bool]:
     """
     Run Semgrep scan on code.
     
@@ -303,12 +462,43 @@ def run_semgrep_scan(filename: str, code: str, ruleset: str = "p/security-audit"
         ruleset: Semgrep ruleset to use
         
     Returns:
-        Tuple[List[Dict], bool, bool]: (findings, timeout, truncated)
+        Tuple[List[Dict], bool, bool, bool]: (findings, timeout, truncated, ok)
     """
     runner = get_semgrep_runner()
     return runner.run_scan(filename, code, ruleset)
 
 
+def analyze(filename: str, code: str) -> Tuple[List[Dict], bool]:
+    """
+    Analyze code using Semgrep, matching the Flawfinder analyzer interface.
+    
+    Args:
+        filename: Name of the file to scan
+        code: Source code to analyze
+        
+    Returns:
+        Tuple[List[Dict], bool]: (findings, success); timeouts and Semgrep
+        errors are failures
+    """
+    findings, _, _, ok = get_semgrep_runner().run_scan(filename, code)
+    return findings, ok
+
+
+def run_semgrep_scan_many(files: List[Tuple[str, str]], ruleset: str = "p/security-audit") -> Tuple[Dict[str, List[Dict]], bool, bool]:
+    """
+    Run a single Semgrep scan over several files.
+    
+    Args:
+        files: List of (filename, code) pairs
+        ruleset: Semgrep ruleset to use
+        
+    Returns:
+        Tuple[Dict[str, List[Dict]], bool, bool]: (findings by filename, timeout, truncated)
+    """
+    runner = get_semgrep_runner()
+    return runner.run_scan_batch(files, ruleset)
+
+
 def get_semgrep_version() -> Optional[str]:
     """
     Get Semgrep version.
@@ -5,9 +5,18 @@ from typing import List, Dict, Tuple, Optional
 from abc import ABC, abstractmethod
 
 from .config import get_config
+from .utils import empty_summary_stats, add_summary_stats, finish_summary_stats, confidence_score
 
 logger = logging.getLogger(__name__)
 
+# Format string literal within the first three arguments of a printf-family call
+# (earlier arguments may contain one level of parentheses, e.g. sizeof(buf))
+_LITERAL_FORMAT_RE = re.compile(r'\b\w*printf\s*\(\s*(?:(?:[^,"()]|\([^()"]*\))+,\s*){0,2}"')
+# snprintf size argument given as sizeof(...), a constant name or a number
+_EXPLICIT_SIZE_RE = re.compile(r'\bv?snprintf\s*\(\s*[^,]+,\s*(?:sizeof\s*\(|[A-Z_][A-Z0-9_]*\s*,|\d+\s*,)')
+# exec-family call whose program is a literal absolute path
+_CONSTANT_PATH_RE = re.compile(r'\bexec\w*\s*\(\s*"/')
+
 class SuppressionRule(ABC):
     """Base class for suppression rules."""
     
@@ -19,6 +28,39 @@ class SuppressionRule(ABC):
             Tuple of (matches, reason, confidence_boost)
         """
         pass
+    
+    def _get_line(self, code: str, line_num: int) -> str:
+        """Get specific line from code."""
+        lines = code.split('\n')
+        if 0 <= line_num - 1 < len(lines):
+            return lines[line_num - 1]
+        return ""
+    
+    def _get_prev_lines(self, code: str, line_num: int, count: int) -> List[str]:
+        """Get previous lines from code."""
+        lines = code.split('\n')
+        start = max(0, line_num - count - 1)
+        end = line_num - 1
+        return lines[start:end]
+    
+    def _get_next_lines(self, code: str, line_num: int, count: int) -> List[str]:
+        """Get next lines from code."""
+        lines = code.split('\n')
+        start = line_num
+        end = min(len(lines), line_num + count)
+        return lines[start:end]
+    
+    def _has_literal_format(self, line: str) -> bool:
+        """Check if a printf-family call takes a string literal format."""
+        return bool(_LITERAL_FORMAT_RE.search(line))
+    
+    def _has_explicit_size(self, line: str) -> bool:
+        """Check if an snprintf call passes sizeof, a constant or a number as size."""
+        return bool(_EXPLICIT_SIZE_RE.search(line))
+    
+    def _has_constant_path(self, line: str) -> bool:
+        """Check if an exec-family call runs a literal absolute path."""
+        return bool(_CONSTANT_PATH_RE.search(line))
 
 class PrintfLiteralFormatRule(SuppressionRule):
     """R1: printf_family_literal_format - Safe literal format strings."""
@@ -534,52 +576,62 @@ class SuppressionEngine:
         suppressed_count = 0
         
         for finding in findings:
-            # Check never-suppress functions
-            function = finding.get("context", {}).get("function", "")
-            if function in config.never_suppress_funcs:
-                continue
-            
-            # Check strict thresholds
-            cwe_id = finding.get("cwe_id", "")
-            min_threshold = config.safe_strict_min_thresholds.get(cwe_id, 0.90)
-            confidence = finding.get("confidence", 0.80)
-            
-            if confidence < min_threshold:
-                continue
-            
-            # Apply rules in order
-            for rule in self.rules:
-                matches, reason, confidence_boost = rule.matches(finding, code)
-                if matches:
-                    finding["status"] = "SUPPRESSED"
-                    finding["suppression_reason"] = reason
-                    finding["suppression_confidence"] = confidence_boost
-                    suppressed_count += 1
-                    break
+            if self._suppress_finding(finding, code, config):
+                suppressed_count += 1
         
         logger.info(f"Suppressed {suppressed_count} findings out of {len(findings)}")
         return findings
     
-    def _get_line(self, code: str, line_num: int) -> str:
-        """Get specific line from code."""
-        lines = code.split('\n')
-        if 0 <= line_num - 1 < len(lines):
-            return lines[line_num - 1]
-        return ""
-    
-    def _get_prev_lines(self, code: str, line_num: int, count: int) -> List[str]:
-        """Get previous lines from code."""
-        lines = code.split('\n')
-        start = max(0, line_num - count - 1)
-        end = line_num - 1
-        return lines[start:end]
+    def apply_suppression_with_summary(self, findings: List[Dict], code: str) -> Tuple[List[Dict], Dict, int]:
+        """
+        Apply false-positive suppression and build the scan summary in one pass.
+        
+        Args:
+            findings: Findings to process (updated in place)
+            code: Scanned source code
+            
+        Returns:
+            Tuple[List[Dict], Dict, int]: Findings, summary statistics and the
+            number of findings with SUPPRESSED status (including earlier ones)
+        """
+        config = get_config()
+        suppressed_count = 0
+        summary = empty_summary_stats()
+        
+        for finding in findings:
+            if self._suppress_finding(finding, code, config):
+                suppressed_count += 1
+            add_summary_stats(summary, finding)
+        
+        logger.info(f"Suppressed {suppressed_count} findings out of {len(findings)}")
+        finish_summary_stats(summary, len(findings))
+        return findings, summary, summary['totals_by_status'].get('SUPPRESSED', 0)
     
-    def _get_next_lines(self, code: str, line_num: int, count: int) -> List[str]:
-        """Get next lines from code."""
-        lines = code.split('\n')
-        start = line_num
-        end = min(len(lines), line_num + count)
-        return lines[start:end]
+    def _suppress_finding(self, finding: Dict, code: str, config) -> bool:
+        """Suppress a finding if a rule matches; returns True if suppressed."""
+        # Check never-suppress functions
+        function = finding.get("context", {}).get("function", "")
+        if function in config.never_suppress_funcs:
+            return False
+        
+        # Check strict thresholds
+        cwe_id = finding.get("cwe_id", "")
+        min_threshold = config.safe_strict_min_thresholds.get(cwe_id, 0.90)
+        confidence = confidence_score(finding.get("confidence"), 0.80)
+        
+        if confidence < min_threshold:
+            return False
+        
+        # Apply rules in order
+        for rule in self.rules:
+            matches, reason, confidence_boost = rule.matches(finding, code)
+            if matches:
+                finding["status"] = "SUPPRESSED"
+                finding["suppression_reason"] = reason
+                finding["suppression_confidence"] = confidence_boost
+                return True
+        
+        return False
 
 # Global suppression engine instance
 suppression_engine = SuppressionEngine()
@@ -587,3 +639,7 @@ suppression_engine = SuppressionEngine()
 def apply_false_positive_suppression(findings: List[Dict], code: str) -> List[Dict]:
     """Apply false-positive suppression to findings."""
     return suppression_engine.apply_suppression(findings, code)
+
+def apply_suppression_with_summary(findings: List[Dict], code: str) -> Tuple[List[Dict], Dict, int]:
+    """Apply false-positive suppression and summarize findings in one pass."""
+    return suppression_engine.apply_suppression_with_summary(findings, code)
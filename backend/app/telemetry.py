@@ -1,8 +1,9 @@
 """Telemetry and metrics module for SAFECode-Web backend."""
 
 import time
+import asyncio
 import statistics
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from collections import defaultdict, deque
 import threading
 import logging
@@ -11,6 +12,22 @@ from .models import TelemetryData, Alert
 from .config import get_config
 
 
+def count_by_cwe(findings: Iterable[Dict]) -> Dict[str, int]:
+    """
+    Count findings per CWE.
+    
+    Args:
+        findings: Findings to count
+        
+    Returns:
+        Dict[str, int]: Number of findings for each CWE ID
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    for finding in findings:
+        counts[finding.get('cwe_id', 'CWE-000')] += 1
+    return counts
+
+
 class StreamingPercentile:
     """Simple streaming percentile estimator."""
     
@@ -62,6 +79,9 @@ class TelemetryCollector:
         self.scan_durations = StreamingPercentile()
         self.lock = threading.Lock()
         
+        # Scan metrics queued by request handlers, folded in by drain_pending()
+        self.pending = deque(maxlen=10000)
+        
         # Alert thresholds
         self.critical_findings_threshold = 5
         self.timeout_rate_threshold = 0.1  # 10%
@@ -72,6 +92,10 @@ class TelemetryCollector:
         self.baseline_suppression_rate = None
         self.baseline_findings_by_cwe = {}
         
+        # Last published telemetry; replaced wholesale, so readers need no lock
+        self.snapshot: Optional[TelemetryData] = None
+        self.snapshot_json: Optional[bytes] = None
+        
         self.logger = logging.getLogger(__name__)
     
     def record_scan_request(self, duration: float, findings: List[Dict], 
@@ -88,20 +112,58 @@ class TelemetryCollector:
             truncated: Whether results were truncated
         """
         with self.lock:
-            self.scan_requests_total += 1
-            self.scan_durations.add_value(duration)
-            self.suppressions_total += suppressions
-            
-            if timeout:
-                self.timeouts_total += 1
-            
-            if truncated:
-                self.truncations_total += 1
-            
-            # Count findings by CWE
-            for finding in findings:
-                cwe = finding.get('cwe_id', 'CWE-000')
-                self.findings_by_cwe[cwe] += 1
+            self._record_locked(duration, count_by_cwe(findings), suppressions, timeout, truncated)
+    
+    def enqueue_scan_request(self, duration: float, findings: List[Dict], 
+                           suppressions: int, timeout: bool = False, 
+                           truncated: bool = False,
+                           cwe_counts: Optional[Dict[str, int]] = None):
+        """
+        Queue a scan request's metrics without taking the lock.
+        
+        Queued metrics are aggregated by drain_pending(), which runs before
+        every read of the collected data. Only per-CWE counts are queued, so
+        the findings themselves can be freed as soon as the response is sent.
+        
+        Args:
+            duration: Scan duration in seconds
+            findings: List of findings
+            suppressions: Number of suppressions applied
+            timeout: Whether the scan timed out
+            truncated: Whether results were truncated
+            cwe_counts: Precomputed per-CWE counts of findings, if available
+        """
+        if cwe_counts is None:
+            cwe_counts = count_by_cwe(findings)
+        self.pending.append((duration, cwe_counts, suppressions, timeout, truncated))
+    
+    def drain_pending(self):
+        """Aggregate all queued scan metrics."""
+        with self.lock:
+            self._drain_locked()
+    
+    def _drain_locked(self):
+        """Aggregate queued scan metrics (caller holds the lock)."""
+        pending = self.pending
+        while pending:
+            self._record_locked(*pending.popleft())
+    
+    def _record_locked(self, duration: float, cwe_counts: Dict[str, int], 
+                       suppressions: int, timeout: bool, truncated: bool):
+        """Apply one scan's metrics (caller holds the lock)."""
+        self.scan_requests_total += 1
+        self.scan_durations.add_value(duration)
+        self.suppressions_total += suppressions
+        
+        if timeout:
+            self.timeouts_total += 1
+        
+        if truncated:
+            self.truncations_total += 1
+        
+        # Count findings by CWE
+        for cwe, count in cwe_counts.items():
+            self.findings_by_cwe[cwe] += count
     
     def get_telemetry_data(self) -> TelemetryData:
         """
@@ -111,6 +173,7 @@ class TelemetryCollector:
             TelemetryData: Current telemetry data
         """
         with self.lock:
+            self._drain_locked()
             return TelemetryData(
                 scan_requests_total=self.scan_requests_total,
                 scan_duration_p50=self.scan_durations.get_percentile(0.5),
@@ -121,6 +184,43 @@ class TelemetryCollector:
                 truncations_total=self.truncations_total
             )
     
+    def refresh_snapshot(self) -> TelemetryData:
+        """
+        Rebuild and publish the telemetry snapshot and its JSON encoding.
+        
+        Returns:
+            TelemetryData: The new snapshot
+        """
+        snapshot = self.get_telemetry_data()
+        self.snapshot_json = snapshot.model_dump_json().encode('utf-8')
+        self.snapshot = snapshot
+        return snapshot
+    
+    def get_snapshot(self) -> TelemetryData:
+        """
+        Get the last published telemetry snapshot without taking the lock.
+        
+        Returns:
+            TelemetryData: Snapshot, at most one refresh interval old
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.refresh_snapshot()
+        return snapshot
+    
+    def get_snapshot_json(self) -> bytes:
+        """
+        Get the last published telemetry snapshot, already encoded as JSON.
+        
+        Returns:
+            bytes: JSON snapshot, at most one refresh interval old
+        """
+        snapshot_json = self.snapshot_json
+        if snapshot_json is None:
+            self.refresh_snapshot()
+            snapshot_json = self.snapshot_json
+        return snapshot_json
+    
     def update_baseline(self, suppression_rate: float, findings_by_cwe: Dict[str, int]):
         """
         Update baseline metrics.
@@ -144,6 +244,8 @@ class TelemetryCollector:
         current_time = time.time()
         
         with self.lock:
+            self._drain_locked()
+            
             # Check for critical findings
             critical_findings = self.findings_by_cwe.get('CWE-120', 0) + \
                                self.findings_by_cwe.get('CWE-121', 0) + \
@@ -223,10 +325,13 @@ class TelemetryCollector:
             self.suppressions_total = 0
             self.timeouts_total = 0
             self.truncations_total = 0
+            self.pending.clear()
             self.findings_by_cwe.clear()
             self.scan_durations = StreamingPercentile()
             self.baseline_suppression_rate = None
             self.baseline_findings_by_cwe.clear()
+            self.snapshot = None
+            self.snapshot_json = None
 
 
 # Global telemetry instance
@@ -275,6 +380,23 @@ def get_current_telemetry() -> TelemetryData:
     return telemetry.get_telemetry_data()
 
 
+async def refresh_telemetry_periodically(interval: float):
+    """
+    Aggregate queued scan metrics and refresh the telemetry snapshot every
+    `interval` seconds until cancelled.
+    
+    Args:
+        interval: Seconds between refreshes
+    """
+    telemetry = get_telemetry()
+    while True:
+        try:
+            telemetry.refresh_snapshot()
+        except Exception as e:
+            telemetry.logger.error(f"Error refreshing telemetry snapshot: {e}")
+        await asyncio.sleep(interval)
+
+
 def generate_alerts() -> List[Alert]:
     """
     Generate alerts based on current metrics.
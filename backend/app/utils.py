@@ -7,6 +7,9 @@ import time
 from typing import Any, Dict, List, Optional, Union
 import logging
 
+# Content types carrying text, matched anywhere in the header value
+_TEXT_CONTENT_TYPE_RE = re.compile(r'json|text|xml|html', re.IGNORECASE)
+
 
 def setup_utf8_encoding():
     """Configure UTF-8 encoding for stdout and stderr."""
@@ -105,6 +108,33 @@ def parse_semgrep_confidence(confidence: str) -> str:
     return confidence_map.get(confidence.upper(), 'medium')
 
 
+# Numeric confidence for the labels used by Semgrep and the AI engine, on the
+# same scale as Flawfinder's scores and the suppression thresholds
+_CONFIDENCE_SCORES = {
+    'low': 0.50,
+    'medium': 0.80,
+    'high': 0.95
+}
+
+
+def confidence_score(confidence: Any, default: Optional[float] = None) -> Optional[float]:
+    """
+    Convert a confidence label or number to a numeric score.
+    
+    Args:
+        confidence: Numeric score or label ("low", "medium", "high")
+        default: Value returned for unknown labels
+        
+    Returns:
+        Optional[float]: Score between 0 and 1, or default
+    """
+    if isinstance(confidence, (int, float)) and not isinstance(confidence, bool):
+        return float(confidence)
+    if isinstance(confidence, str):
+        return _CONFIDENCE_SCORES.get(confidence.lower(), default)
+    return default
+
+
 def extract_cwe_from_message(message: str) -> str:
     """Extract CWE ID from Semgrep message."""
     cwe_match = re.search(r'CWE-(\d+)', message, re.IGNORECASE)
@@ -124,34 +154,46 @@ def calculate_suppression_rate(findings: List[Dict]) -> float:
 
 def create_summary_stats(findings: List[Dict]) -> Dict:
     """Create summary statistics from findings."""
-    summary = {
+    summary = empty_summary_stats()
+    
+    for finding in findings:
+        add_summary_stats(summary, finding)
+    
+    return finish_summary_stats(summary, len(findings))
+
+
+def empty_summary_stats() -> Dict:
+    """Create an empty summary to be filled by add_summary_stats."""
+    return {
         'totals_by_severity': {},
         'totals_by_status': {},
         'by_cwe': {},
         'by_status': {}
     }
+
+
+def add_summary_stats(summary: Dict, finding: Dict) -> None:
+    """Count one finding into a summary."""
+    severity = finding.get('severity', 'MEDIUM')
+    status = finding.get('status', 'ACTIVE')
+    cwe = finding.get('cwe_id', 'CWE-000')
     
-    for finding in findings:
-        severity = finding.get('severity', 'MEDIUM')
-        status = finding.get('status', 'ACTIVE')
-        cwe = finding.get('cwe_id', 'CWE-000')
-        
-        # Count by severity
-        summary['totals_by_severity'][severity] = summary['totals_by_severity'].get(severity, 0) + 1
-        
-        # Count by status
-        summary['totals_by_status'][status] = summary['totals_by_status'].get(status, 0) + 1
-        
-        # Count by CWE
-        summary['by_cwe'][cwe] = summary['by_cwe'].get(cwe, 0) + 1
-        
-        # Count by status and severity
-        if status not in summary['by_status']:
-            summary['by_status'][status] = {}
-        summary['by_status'][status][severity] = summary['by_status'][status].get(severity, 0) + 1
+    # Count by severity
+    summary['totals_by_severity'][severity] = summary['totals_by_severity'].get(severity, 0) + 1
     
-    # Calculate suppression rate
-    total = len(findings)
+    # Count by status
+    summary['totals_by_status'][status] = summary['totals_by_status'].get(status, 0) + 1
+    
+    # Count by CWE
+    summary['by_cwe'][cwe] = summary['by_cwe'].get(cwe, 0) + 1
+    
+    # Count by status and severity
+    by_severity = summary['by_status'].setdefault(status, {})
+    by_severity[severity] = by_severity.get(severity, 0) + 1
+
+
+def finish_summary_stats(summary: Dict, total: int) -> Dict:
+    """Add the suppression rate to a summary of `total` findings."""
     suppressed = summary['totals_by_status'].get('SUPPRESSED', 0)
     summary['suppression_rate'] = suppressed / total if total > 0 else 0.0
     
@@ -211,9 +253,9 @@ def setup_logging(level: str = "info") -> None:
 def time_function(func):
     """Decorator to time function execution."""
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.monotonic()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.monotonic()
         duration = end_time - start_time
         
         # Log timing information
@@ -241,6 +283,11 @@ def create_cache_key(*args) -> str:
     return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
 
 
+def is_text_content_type(content_type: str) -> bool:
+    """Check if a Content-Type header value denotes a text-like body."""
+    return _TEXT_CONTENT_TYPE_RE.search(content_type) is not None
+
+
 def is_safe_for_logging(text: str) -> bool:
     """Check if text is safe for logging (no sensitive data patterns)."""
     sensitive_patterns = [
@@ -0,0 +1,7 @@
+"""Pytest configuration for SAFECode-Web backend tests."""
+
+import sys
+from pathlib import Path
+
+# Make the `app` package importable when pytest runs from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,92 @@
+"""Tests for applying AI decisions ahead of false-positive suppression."""
+
+from app.ai import AISuppressionEngine
+from app.suppression import apply_suppression_with_summary
+
+
+CODE = """#include <stdio.h>
+int main() {
+    printf("Hello World\\n");
+    return 0;
+}
+"""
+
+
+def make_finding(**overrides):
+    """Build a Flawfinder-style CWE-134 finding on the printf line."""
+    finding = {
+        "id": "flawfinder_3_5",
+        "cwe_id": "CWE-134",
+        "title": "Format vulnerability",
+        "severity": "MEDIUM",
+        "status": "ACTIVE",
+        "line": 3,
+        "snippet": '>>>   3:     printf("Hello World\\n");',
+        "file": "hello.c",
+        "tool": "flawfinder",
+        "confidence": 0.80,
+        "suppression_reason": None,
+        "context": {"function": "printf"}
+    }
+    finding.update(overrides)
+    return finding
+
+
+def test_adjust_confidence_stores_numeric_score():
+    engine = AISuppressionEngine()
+    finding = make_finding()
+
+    engine._apply_decision(finding, "adjust_confidence", "literal format", "high")
+
+    assert finding["confidence"] == 0.95
+    assert finding["suppression_reason"] == "ai_adjustment: literal format"
+
+
+def test_adjusted_finding_goes_through_suppression():
+    engine = AISuppressionEngine()
+    lowered = make_finding(id="lowered")
+    raised = make_finding(id="raised")
+
+    engine._apply_decision(lowered, "adjust_confidence", "unsure", "low")
+    engine._apply_decision(raised, "adjust_confidence", "literal format", "high")
+    findings, summary, suppressed = apply_suppression_with_summary([lowered, raised], CODE)
+
+    # Below the CWE-134 threshold the rules are skipped; above it R1 applies
+    assert lowered["status"] == "ACTIVE"
+    assert raised["status"] == "SUPPRESSED"
+    assert raised["suppression_reason"] == "printf_literal_format"
+    assert suppressed == 1
+
+
+def test_cached_adjust_confidence_decision_is_replayed_as_score():
+    engine = AISuppressionEngine()
+    engine.decision_cache.clear()
+    first = make_finding()
+    engine.decision_cache.put(first, CODE, "adjust_confidence", "unsure", "medium")
+
+    second = make_finding()
+    pending = engine._findings_for_model([second], CODE)
+    apply_suppression_with_summary([second], CODE)
+
+    assert pending == []
+    assert second["confidence"] == 0.80
+
+
+def test_unknown_confidence_label_is_ignored():
+    engine = AISuppressionEngine()
+    finding = make_finding()
+
+    engine._apply_decision(finding, "adjust_confidence", "odd", "certain")
+
+    assert finding["confidence"] == 0.80
+    assert finding["suppression_reason"] is None
+
+
+def test_task_block_fits_prompt_budget():
+    engine = AISuppressionEngine()
+    findings = [make_finding(id=f"flawfinder_{i}", title="x " * 50) for i in range(2000)]
+
+    block = engine._task_block(1, findings, CODE)
+
+    assert engine._count_tokens(block) <= engine.prompt_budget + 50
+    assert "findings omitted)" in block
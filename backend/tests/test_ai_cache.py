@@ -0,0 +1,50 @@
+"""Tests for the local cache of AI suppression decisions."""
+
+import time
+
+from app.ai_cache import SuppressionDecisionCache, make_cache_key
+
+
+CODE = """#include <string.h>
+
+void copy_name(char *dst, const char *src) {
+    strcpy(dst, src);
+}
+
+void copy_title(char *dst, const char *src) {
+    if (strlen(src) < 16)
+        strcpy(dst, src);
+}
+"""
+
+
+def make_finding(line, snippet="strcpy(dst, src);"):
+    return {"cwe_id": "CWE-120", "line": line, "snippet": f">>> {line:3d}: {snippet}"}
+
+
+def test_same_line_in_different_functions_gets_different_keys():
+    assert make_cache_key(make_finding(4), CODE) != make_cache_key(make_finding(9), CODE)
+
+
+def test_key_ignores_line_shifts_and_reformatting():
+    shifted = "\n\n" + CODE.replace("    strcpy(dst, src);\n}", "        strcpy(dst,  src);\n}", 1)
+
+    assert make_cache_key(make_finding(4), CODE) == make_cache_key(make_finding(6), shifted)
+
+
+def test_expired_decisions_are_dropped():
+    cache = SuppressionDecisionCache(capacity=10, ttl_seconds=60)
+    finding = make_finding(4)
+    cache.put(finding, CODE, "suppress", "bounded", None)
+    cache.put(make_finding(9), CODE, "keep", "unbounded", None)
+
+    assert cache.get(finding, CODE)["action"] == "suppress"
+
+    cache.entries[make_cache_key(finding, CODE)]["created_at"] = time.time() - 120
+
+    assert cache.get(finding, CODE) is None
+    assert cache.size() == 1
+    # Eviction still works once the expired entry's bucket is gone
+    cache.capacity = 1
+    cache.put(finding, CODE, "suppress", "bounded", None)
+    assert cache.size() == 1
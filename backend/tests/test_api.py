@@ -0,0 +1,107 @@
+"""End-to-end tests for the scan endpoints through the full middleware stack."""
+
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.models import Finding
+
+
+pytestmark = pytest.mark.skipif(
+    main.analyzer_name == "flawfinder" and shutil.which(main.config.flawfinder_path) is None,
+    reason="Flawfinder is not installed"
+)
+
+CODE = """#include <stdio.h>
+#include <string.h>
+
+int main(int argc, char **argv) {
+    char buffer[10];
+    strcpy(buffer, argv[1]);
+    printf(argv[1]);
+    return 0;
+}
+"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.baseline_manager, "baseline_dir", tmp_path)
+    main.scan_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_health_reports_analyzer(client):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["analyzer"] == main.analyzer_name
+    assert body["analyzer_available"] is True
+    assert body["analyzer_version"]
+
+
+def test_scan_returns_findings(client):
+    response = client.post("/scan", json={"filename": "api_scan.c", "code": CODE})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["findings"]
+    assert body["baseline"] is None
+    assert "x-ratelimit-remaining" in response.headers
+
+
+# Pydantic reports response fields that drift from the models as UserWarnings
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_scan_findings_match_finding_schema(client):
+    findings = client.post("/scan", json={"filename": "api_schema.c", "code": CODE}).json()["findings"]
+
+    assert findings
+    for finding in findings:
+        assert Finding.model_validate(finding).model_dump(mode="json") == finding
+
+
+def test_scan_compares_with_saved_baseline(client):
+    first = client.post("/scan", json={"filename": "api_baseline.c", "code": CODE}).json()
+    main.baseline_manager.save_baseline("api_baseline.c", main.BASELINE_BRANCH, first["findings"] * 2)
+
+    response = client.post("/scan", json={"filename": "api_baseline.c", "code": CODE + "\n"})
+
+    assert response.status_code == 200
+    baseline = response.json()["baseline"]
+    assert baseline is not None
+    assert baseline["active"]
+    assert all(change["change"] < 0 for change in baseline["severity_changes"].values())
+
+
+def test_cached_scan_still_consumes_rate_limit(client):
+    payload = {"filename": "api_cached.c", "code": CODE}
+    first = client.post("/scan", json=payload)
+    second = client.post("/scan", json=payload)
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get_list("x-ratelimit-remaining") == [
+        str(int(first.headers["x-ratelimit-remaining"]) - 1)
+    ]
+    # Per-request body fields are current too, not copies of the first response
+    assert second.json()["rate_limit"]["remaining"] == int(second.headers["x-ratelimit-remaining"])
+    assert second.json()["findings"] == first.json()["findings"]
+    assert "x-response-time" not in second.headers
+
+
+@pytest.mark.parametrize("path", ["/scan", "/scan/raw", "/fix"])
+@pytest.mark.parametrize("payload", [
+    {"filename": "empty.c", "code": ""},
+    {"filename": "blank.c", "code": " \n\t "},
+    {"filename": "long.c", "code": "x" * (main.config.safe_max_inline_code_chars + 1)},
+    {"filename": "bad name.c", "code": "int x;"},
+])
+def test_invalid_requests_are_rejected(client, path, payload):
+    headers = {"Authorization": f"Bearer {main.config.api_token}"}
+
+    response = client.post(path, json=payload, headers=headers)
+
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+"""Tests for saving, loading and listing baselines."""
+
+import pytest
+
+from app.baseline import BaselineManager
+
+
+FINDINGS = [
+    {"id": "f1", "cwe_id": "CWE-120", "severity": "HIGH", "status": "ACTIVE"},
+    {"id": "f2", "cwe_id": "CWE-134", "severity": "MEDIUM", "status": "SUPPRESSED"},
+]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return BaselineManager(str(tmp_path))
+
+
+def test_loaded_baseline_changes_do_not_leak_into_cache(manager):
+    manager.save_baseline("repo", "main", FINDINGS)
+
+    loaded = manager.load_baseline("repo", "main")
+    loaded["findings"].clear()
+    loaded["summary"]["totals_by_severity"]["HIGH"] = 99
+
+    reloaded = manager.load_baseline("repo", "main")
+    assert len(reloaded["findings"]) == 2
+    assert reloaded["summary"]["totals_by_severity"]["HIGH"] == 1
+    assert manager.get_baseline_stats("repo", "main")["summary"] == reloaded["summary"]
+
+
+def test_branch_named_like_a_sidecar_keeps_its_own_files(manager):
+    manager.save_baseline("repo", "main", FINDINGS)
+    manager.save_baseline("repo", "main.meta", FINDINGS[:1])
+
+    listed = {item["branch"]: item["findings_count"] for item in manager.list_baselines()}
+
+    assert listed == {"main": 2, "main.meta": 1}
+    assert manager.get_baseline_stats("repo", "main")["findings_count"] == 2
+
+
+def test_legacy_sidecars_are_not_listed_as_baselines(manager, tmp_path):
+    manager.save_baseline("repo", "main", FINDINGS)
+    (tmp_path / "repo" / "main.meta.json").write_text('{"repo": "repo", "branch": "main", "findings_count": 2}')
+
+    assert [item["branch"] for item in manager.list_baselines()] == ["main"]
@@ -0,0 +1,17 @@
+"""Tests for the token bucket rate limiter."""
+
+from app.rate_limit import TokenBucketRateLimiter
+
+
+def test_retry_after_is_time_until_one_token():
+    # One token every 36 seconds
+    limiter = TokenBucketRateLimiter(max_requests=100, window_seconds=3600)
+    for _ in range(100):
+        assert limiter.is_allowed("10.0.0.1")[0]
+
+    allowed, info = limiter.is_allowed("10.0.0.1")
+
+    assert not allowed
+    assert info["remaining"] == 0
+    assert 1 <= info["retry_after"] <= 36
+    assert "retry_after" not in limiter.get_info("10.0.0.1")
@@ -0,0 +1,46 @@
+"""Tests for driving the Flawfinder process."""
+
+import stat
+import sys
+
+import pytest
+
+from app.sast_runner import FlawfinderRunner
+
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses an executable script stand-in for Flawfinder")
+
+# Rejects stdin without reading it and floods stderr, which deadlocks a
+# caller that leaves stderr undrained; scans files normally.
+FAKE_FLAWFINDER = f"""#!{sys.executable}
+import sys
+target = sys.argv[-1]
+if target == "-":
+    sys.stdin.close()
+    sys.stderr.write("x" * (1 << 20))
+    sys.exit(2)
+print("2,5,4,buffer,strcpy does not check for buffer overflows,Consider strlcpy")
+"""
+
+
+@pytest.fixture
+def runner(tmp_path):
+    script = tmp_path / "flawfinder"
+    script.write_text(FAKE_FLAWFINDER)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    runner = FlawfinderRunner.__new__(FlawfinderRunner)
+    runner.tool_name = str(script)
+    runner.timeout = 10
+    runner.available = True
+    return runner
+
+
+def test_rejected_stdin_falls_back_to_temp_file(runner):
+    # Large enough to overflow the stdin pipe buffer once the reader is gone
+    code = "int main() {\n    strcpy(a, b);\n}\n" + "// padding\n" * 50000
+
+    vulnerabilities, success = runner.run_scan(code, "big.c")
+
+    assert success
+    assert [(v.line, v.category) for v in vulnerabilities] == [(2, "buffer")]
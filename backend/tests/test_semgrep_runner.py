@@ -0,0 +1,74 @@
+"""Tests for reporting Semgrep failures."""
+
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+import app.main as main
+import app.semgrep_runner as semgrep_runner
+from app.scan_cache import make_scan_key
+
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses an executable script stand-in for Semgrep")
+
+# Reports a version, then behaves as selected by FAKE_SEMGREP_MODE
+FAKE_SEMGREP = f"""#!{sys.executable}
+import os
+import sys
+if "--version" in sys.argv:
+    print("1.0.0")
+    sys.exit(0)
+mode = os.environ["FAKE_SEMGREP_MODE"]
+if mode == "error":
+    sys.stderr.write("Failed to download configuration from p/security-audit")
+    sys.exit(2)
+if mode == "garbage":
+    print("not json")
+    sys.exit(0)
+print('{{"results": [], "errors": []}}')
+"""
+
+CODE = "int main() { return 0; }\n"
+
+
+@pytest.fixture
+def use_fake_semgrep(tmp_path, monkeypatch):
+    script = tmp_path / "semgrep"
+    script.write_text(FAKE_SEMGREP)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(semgrep_runner, "_semgrep_runner", semgrep_runner.SemgrepRunner())
+    monkeypatch.setattr(main, "run_analyzer", semgrep_runner.analyze)
+    main.scan_cache.clear()
+
+    def use(mode):
+        monkeypatch.setenv("FAKE_SEMGREP_MODE", mode)
+
+    return use
+
+
+def cached_findings():
+    key = make_scan_key(main.analyzer_name, main._analyzer_version, "clean.c", CODE)
+    return main.scan_cache.get(key)
+
+
+@pytest.mark.parametrize("mode", ["error", "garbage"])
+def test_failed_semgrep_run_is_not_success_or_cached(use_fake_semgrep, mode):
+    use_fake_semgrep(mode)
+
+    findings, success = asyncio.run(main._run_analyzer_cached("clean.c", CODE))
+
+    assert (findings, success) == ([], False)
+    assert cached_findings() is None
+
+
+def test_clean_semgrep_run_is_success_and_cached(use_fake_semgrep):
+    use_fake_semgrep("ok")
+
+    findings, success = asyncio.run(main._run_analyzer_cached("clean.c", CODE))
+
+    assert (findings, success) == ([], True)
+    assert cached_findings() == []
@@ -0,0 +1,70 @@
+"""Tests for the false-positive suppression rules."""
+
+import pytest
+
+from app.suppression import (
+    ExeclNoShellRule, SnprintfLiteralFormatRule, SuppressionEngine, apply_suppression_with_summary
+)
+
+
+CODE = """#include <stdio.h>
+#include <string.h>
+#include <unistd.h>
+
+int main(int argc, char **argv) {
+    char buffer[16];
+    printf("Hello %s\\n", argv[0]);
+    printf(argv[1]);
+    snprintf(buffer, sizeof(buffer), "%s", argv[1]);
+    snprintf(buffer, argc, argv[1]);
+    strncpy(buffer, argv[1], sizeof(buffer) - 1);
+    buffer[sizeof(buffer) - 1] = '\\0';
+    execl("/bin/ls", "ls", "--", argv[1], NULL);
+    execl(argv[2], "ls", argv[1], NULL);
+    return 0;
+}
+"""
+
+
+def make_finding(line, cwe_id, function, confidence=0.99):
+    return {
+        "id": f"flawfinder_{line}",
+        "cwe_id": cwe_id,
+        "severity": "HIGH",
+        "status": "ACTIVE",
+        "line": line,
+        "confidence": confidence,
+        "suppression_reason": None,
+        "context": {"function": function}
+    }
+
+
+@pytest.mark.parametrize("line, expected", [(7, "printf_literal_format"), (8, None)])
+def test_printf_literal_format(line, expected):
+    finding = make_finding(line, "CWE-134", "printf")
+
+    apply_suppression_with_summary([finding], CODE)
+
+    assert finding["suppression_reason"] == expected
+
+
+@pytest.mark.parametrize("line, expected", [(9, True), (10, False)])
+def test_snprintf_needs_literal_format_and_explicit_size(line, expected):
+    matches, _, _ = SnprintfLiteralFormatRule().matches(make_finding(line, "CWE-134", "snprintf"), CODE)
+
+    assert matches is expected
+
+
+@pytest.mark.parametrize("line, expected", [(13, True), (14, False)])
+def test_execl_needs_constant_path(line, expected):
+    matches, _, _ = ExeclNoShellRule().matches(make_finding(line, "CWE-78", "execl"), CODE)
+
+    assert matches is expected
+
+
+def test_every_rule_runs_on_a_finding_above_threshold():
+    # Rules read surrounding lines through the SuppressionRule helpers
+    finding = make_finding(11, "CWE-120", "strncpy")
+
+    for rule in SuppressionEngine().rules:
+        rule.matches(finding, CODE)